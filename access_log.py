@@ -0,0 +1,253 @@
+import os
+import glob
+import json
+import time
+import heapq
+import queue
+import atexit
+import threading
+from datetime import datetime, date, timedelta
+
+import metrics
+from faculty_db import get_faculty_info
+from atomic_file import atomic_write
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+LOG_DIR = "logs"
+MAX_BYTES = 5 * 1024 * 1024   # start a new segment once a day's file reaches this
+FLUSH_INTERVAL = 1.0          # seconds a batch may wait before write + fsync
+BATCH_SIZE = 256
+
+# Layout (one set per day and writer process; main.py, service.py and
+# doors.py may all log at once, so no two processes share a file):
+#   logs/access-2026-10-18.p4242.jsonl, access-2026-10-18.p4242.1.jsonl, ...   entries
+#   logs/access-2026-10-18.p4242.idx.json   {"segments": [...], "faculty": {id: [[seg, offset], ...]}}
+# Queries merge every writer's index for the day. (Files from before the
+# per-process layout, access-<day>.jsonl / .idx.json, are read the same way.)
+
+def writer_tag():
+    return f"p{os.getpid()}"
+
+def segment_name(day, number, tag):
+    suffix = f".{number}" if number else ""
+    return f"access-{day}.{tag}{suffix}.jsonl"
+
+def index_path(log_dir, day, tag):
+    return os.path.join(log_dir, f"access-{day}.{tag}.idx.json")
+
+def day_index_paths(log_dir, day):
+    return sorted(glob.glob(os.path.join(glob.escape(log_dir), f"access-{day}*.idx.json")))
+
+def read_index(path):
+    if not os.path.exists(path):
+        return {"segments": [], "faculty": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def load_day_index(log_dir, day, tag):
+    return read_index(index_path(log_dir, day, tag))
+
+# --------------------------------------------------
+# BACKGROUND WRITER
+# --------------------------------------------------
+_STOP = object()
+
+class AccessLogWriter:
+
+    def __init__(self, log_dir=LOG_DIR, max_bytes=MAX_BYTES, flush_interval=FLUSH_INTERVAL):
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.tag = writer_tag()
+        self.queue = queue.Queue()
+
+        self.day = None
+        self.day_index = None
+        self.file = None
+
+        os.makedirs(log_dir, exist_ok=True)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def write(self, entry):
+        # Called on the unlock path: never touches the disk
+        self.queue.put(entry)
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+
+    # ---------- writer thread ----------
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            item = self.queue.get()
+            deadline = time.monotonic() + self.flush_interval
+
+            while item is not _STOP:
+                batch.append(item)
+                if len(batch) >= BATCH_SIZE:
+                    break
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            stopping = item is _STOP
+            if batch:
+                try:
+                    with metrics.span("log.flush"):
+                        self._write_batch(batch)
+                except OSError as e:
+                    print(f"⚠️ Access log write failed: {e}")
+
+        if self.file:
+            self.file.close()
+
+    def _open_segment(self, day):
+        if day != self.day:
+            if self.file:
+                self.file.close()
+            self.day = day
+            self.day_index = load_day_index(self.log_dir, day, self.tag)
+            if not self.day_index["segments"]:
+                self.day_index["segments"].append(segment_name(day, 0, self.tag))
+            self.file = open(os.path.join(self.log_dir, self.day_index["segments"][-1]), "ab")
+
+        if self.file.tell() >= self.max_bytes:
+            self.file.close()
+            name = segment_name(day, len(self.day_index["segments"]), self.tag)
+            self.day_index["segments"].append(name)
+            self.file = open(os.path.join(self.log_dir, name), "ab")
+
+    def _write_batch(self, batch):
+        touched_days = set()
+
+        for entry in batch:
+            day = entry["ts"][:10]
+            if day != self.day and self.day in touched_days:
+                self._flush_day()
+                touched_days.discard(self.day)
+            self._open_segment(day)
+
+            offset = self.file.tell()
+            self.file.write((json.dumps(entry) + "\n").encode("utf-8"))
+
+            segment = len(self.day_index["segments"]) - 1
+            faculty_id = str(entry.get("faculty_id") or "UNKNOWN")
+            self.day_index["faculty"].setdefault(faculty_id, []).append([segment, offset])
+            touched_days.add(day)
+
+        if touched_days:
+            self._flush_day()
+
+    def _flush_day(self):
+        # One fsync per batch, then this writer's sidecar index (written
+        # atomically; no other process writes it)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        with atomic_write(index_path(self.log_dir, self.day, self.tag)) as f:
+            json.dump(self.day_index, f)
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = AccessLogWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+def log_access(faculty_id, method, status, door=None):
+    # Queued for the background writer; the unlock path never waits on disk
+    with metrics.span("log.write"):
+        name, department = ("UNKNOWN", "UNKNOWN") if faculty_id is None else get_faculty_info(faculty_id)
+        entry = {
+            "ts": datetime.now().isoformat(timespec="seconds"),
+            "faculty_id": None if faculty_id is None else str(faculty_id),
+            "name": name,
+            "department": department,
+            "method": method,
+            "status": status
+        }
+        if door:
+            entry["door"] = door
+        get_writer().write(entry)
+
+# --------------------------------------------------
+# QUERIES (only the requested days, and only indexed offsets per person)
+# --------------------------------------------------
+def _days(since, until):
+    day = since
+    while day <= until:
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+def _read_at(log_dir, segments, positions):
+    handles = {}
+    try:
+        for segment, offset in positions:
+            if segment not in handles:
+                handles[segment] = open(os.path.join(log_dir, segments[segment]), "rb")
+            handles[segment].seek(offset)
+            yield json.loads(handles[segment].readline())
+    finally:
+        for f in handles.values():
+            f.close()
+
+def _read_all(log_dir, segments):
+    for name in segments:
+        with open(os.path.join(log_dir, name), "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def _day_entries(log_dir, day, faculty_id):
+    # Each writer's entries are in time order; merge the writers by timestamp
+    streams = []
+    for path in day_index_paths(log_dir, day):
+        day_index = read_index(path)
+        if faculty_id is not None:
+            positions = day_index["faculty"].get(str(faculty_id), [])
+            streams.append(_read_at(log_dir, day_index["segments"], positions))
+        else:
+            streams.append(_read_all(log_dir, day_index["segments"]))
+    return heapq.merge(*streams, key=lambda entry: entry["ts"])
+
+def query(faculty_id=None, since=None, until=None, status=None, method=None, log_dir=LOG_DIR):
+    until = until or date.today()
+    since = since or until
+
+    for day in _days(since, until):
+        for entry in _day_entries(log_dir, day, faculty_id):
+            if status and entry["status"] != status:
+                continue
+            if method and entry["method"] != method:
+                continue
+            yield entry
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Query the access log")
+    parser.add_argument("--id", help="faculty ID (UNKNOWN for denied attempts)")
+    parser.add_argument("--since", type=date.fromisoformat, help="YYYY-MM-DD (default: --until)")
+    parser.add_argument("--until", type=date.fromisoformat, help="YYYY-MM-DD (default: today)")
+    parser.add_argument("--status", choices=["GRANTED", "DENIED"])
+    parser.add_argument("--method", choices=["FACE", "VOICE"])
+    args = parser.parse_args()
+
+    count = 0
+    for entry in query(args.id, args.since, args.until, args.status, args.method):
+        count += 1
+        print(f"{entry['ts']} | ID: {entry['faculty_id'] or 'UNKNOWN'} | Name: {entry['name']} | "
+              f"Dept: {entry['department']} | Method: {entry['method']} | {entry['status']}"
+              + (f" | Door: {entry['door']}" if "door" in entry else ""))
+    print(f"\n{count} entries")
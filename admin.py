@@ -1,10 +1,16 @@
 import os
-import json
 import shutil
 
+import faculty_db
 from face_capture import capture as face_capture
 from face_train import train as face_train
+from face_train import add_identity as face_add_identity
+from face_train import remove_identity as face_remove_identity
+from face_train import prepare_model as prepare_face_model
+from face_store import remove_faces as face_remove_faces
 from voice_capture import capture as voice_capture
+from voice_embeddings import remove_faculty as remove_voice_embeddings
+from voice_embeddings import sync_store as sync_voice_embeddings
 
 DATABASE_FILE = "database.json"
 FACE_DIR = "faces"
@@ -13,36 +19,18 @@ FACE_MODEL = "face_model.yml"
 
 # ---------------- DATABASE ----------------
 def load_db():
-    if not os.path.exists(DATABASE_FILE):
-        return {}
+    return faculty_db.load_db()
 
-    with open(DATABASE_FILE, "r") as f:
-        db = json.load(f)
-
-    # ---- AUTO-FIX OLD / BROKEN ENTRIES ----
-    fixed_db = {}
-    new_id = 1
-
-    for key, value in db.items():
-        if key.isdigit():
-            fixed_db[key] = value
-        else:
-            fixed_db[str(new_id)] = {
-                "name": key,
-                "department": value.get("department", "Unknown"),
-                "face_path": value.get("face_path", f"{FACE_DIR}/{new_id}"),
-                "voice_path": value.get("voice_path", f"{VOICE_DIR}/{new_id}")
-            }
-            new_id += 1
+def save_db(db):
+    faculty_db.save_db(db)
 
+def fix_legacy_db():
+    # Explicit one-off migration instead of rewriting the file on every load
+    db = faculty_db.load_db()
+    fixed_db = faculty_db.fix_legacy_entries(db, FACE_DIR, VOICE_DIR)
     if fixed_db != db:
-        save_db(fixed_db)
-
-    return fixed_db
-
-def save_db(db):
-    with open(DATABASE_FILE, "w") as f:
-        json.dump(db, f, indent=4)
+        faculty_db.save_db(fixed_db)
+        print("🛠️ Fixed legacy database entries.")
 
 def generate_faculty_id(db):
     numeric_ids = [int(fid) for fid in db.keys() if fid.isdigit()]
@@ -77,12 +65,12 @@ def add_faculty():
     print("\n[1/3] Capturing FACE samples (30 images)...")
     face_capture(faculty_id)
 
-    print("\n[2/3] Training face recognition model...")
-    face_train()
+    print("\n[2/3] Updating face recognition model...")
+    face_add_identity(faculty_id)
 
     # ---------- VOICE ----------
     print("\n[3/3] Capturing VOICE samples (5 recordings × 3s)...")
-    voice_capture(faculty_id)
+    voice_capture(faculty_id)   # embeds the new samples into the store
 
     # ---------- SAVE ----------
     db[faculty_id] = {
@@ -127,29 +115,32 @@ def delete_faculty():
 
     # ---------- DELETE DATA ----------
     shutil.rmtree(os.path.join(FACE_DIR, fid), ignore_errors=True)
+    face_remove_faces(fid)
     shutil.rmtree(os.path.join(VOICE_DIR, fid), ignore_errors=True)
+    remove_voice_embeddings(fid)
 
     del db[fid]
     save_db(db)
 
-    # ---------- RETRAIN FACE MODEL ----------
-    if os.path.exists(FACE_DIR) and os.listdir(FACE_DIR):
-        print("\n🔄 Retraining face model...")
-        face_train()
-    else:
-        if os.path.exists(FACE_MODEL):
-            os.remove(FACE_MODEL)
-            print("⚠️ No faces left. Face model removed.")
+    # ---------- UPDATE FACE MODEL ----------
+    print("\n🔄 Updating face model...")
+    face_remove_identity(fid)
 
     print("✅ Faculty deleted successfully.")
 
 # ---------------- MENU ----------------
 def menu():
+    fix_legacy_db()
+    prepare_face_model()
+
     while True:
         print("\n====== ADMIN PANEL ======")
         print("[1] Add Faculty")
         print("[2] Delete Faculty")
-        print("[3] Exit")
+        print("[3] Rebuild Face Model")
+        print("[4] Resync Voice Embeddings")
+        print("[5] Bulk Import From Folder")
+        print("[6] Exit")
 
         choice = input("Select option: ").strip()
 
@@ -158,6 +149,23 @@ def menu():
         elif choice == "2":
             delete_faculty()
         elif choice == "3":
+            print("\n🔄 Rebuilding face model from all samples...")
+            face_train()
+        elif choice == "4":
+            # For voice samples added or replaced on disk by hand: verification
+            # only reads the store, it never re-embeds
+            print("\n🔄 Re-embedding changed voice samples...")
+            store = sync_voice_embeddings(load_db())
+            print(f"✅ Voice embeddings up to date ({len(store)} faculty).")
+        elif choice == "5":
+            from bulk_enroll import bulk_enroll
+
+            root = input("Folder with one sub-folder per person: ").strip()
+            if os.path.isdir(root):
+                bulk_enroll(root, input("Default department: ").strip() or "Unknown")
+            else:
+                print("❌ Folder not found.")
+        elif choice == "6":
             print("Exiting admin panel.")
             break
         else:
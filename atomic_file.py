@@ -0,0 +1,27 @@
+import os
+import threading
+from contextlib import contextmanager
+
+# --------------------------------------------------
+# WRITE-THEN-RENAME
+#   with atomic_write("face_pack.json") as f:
+#       json.dump(index, f)
+# Readers see the old file or the new one, never half of one. The temp
+# name is unique per process and thread, so two writers never share it;
+# on an error the temp file is removed and the target is left untouched.
+# --------------------------------------------------
+@contextmanager
+def atomic_write(path, mode="w", fsync=False):
+    tmp_file = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    options = {} if "b" in mode else {"encoding": "utf-8"}
+    try:
+        with open(tmp_file, mode, **options) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
@@ -0,0 +1,54 @@
+import numpy as np
+from scipy.io import wavfile
+
+from audio_features import AudioFeatures
+
+SAMPLE_RATE = 16000
+
+# --------------------------------------------------
+# IN-MEMORY RECORDING
+# The int16 buffer from sounddevice is kept as-is for Vosk, converted to
+# float32 exactly once for liveness features/ECAPA, and every consumer gets a view.
+# --------------------------------------------------
+class AudioClip:
+
+    def __init__(self, pcm, sample_rate=SAMPLE_RATE):
+        self.pcm = np.ascontiguousarray(np.asarray(pcm).reshape(-1), dtype=np.int16)
+        self.sample_rate = sample_rate
+        self.samples = self.pcm.astype(np.float32) / 32768.0
+        self._features = None
+
+    def __len__(self):
+        return len(self.pcm)
+
+    @property
+    def duration(self):
+        return len(self.pcm) / self.sample_rate
+
+    def features(self):
+        # One STFT shared by every liveness check that asks for it
+        if self._features is None:
+            self._features = AudioFeatures(self.samples, self.sample_rate)
+        return self._features
+
+    def pcm_chunks(self, frames=4000):
+        # Vosk's AcceptWaveform wants bytes, so only these small chunks are copied
+        for start in range(0, len(self.pcm), frames):
+            yield self.pcm[start:start + frames].tobytes()
+
+def load_audio(path):
+    # WAV file -> AudioClip (mono, int16, SAMPLE_RATE), e.g. for offline tests
+    sr, data = wavfile.read(path)
+    if data.ndim > 1:
+        data = data.mean(axis=1)
+    if data.dtype.kind == "f":
+        data = np.clip(data, -1.0, 1.0) * 32767
+    elif data.dtype == np.int32:
+        data = data / 65536
+    elif data.dtype == np.uint8:
+        data = (data.astype(np.int16) - 128) * 256
+    if sr != SAMPLE_RATE:
+        from scipy.signal import resample_poly
+
+        data = resample_poly(data.astype(np.float32), SAMPLE_RATE, sr)
+    return AudioClip(np.round(data).astype(np.int16))
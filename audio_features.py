@@ -0,0 +1,93 @@
+import numpy as np
+from scipy import fft
+
+# --------------------------------------------------
+# CONFIG (librosa's defaults, so thresholds keep their meaning)
+# --------------------------------------------------
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+AMIN = 1e-10               # power floor for flatness (librosa amin)
+
+_windows = {}
+
+def hann(n):
+    # Periodic Hann, as scipy.signal.get_window("hann", n) / librosa stft
+    window = _windows.get(n)
+    if window is None:
+        window = _windows[n] = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(n) / n)).astype(np.float32)
+    return window
+
+def frame_signal(samples, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+    # Centered, zero-padded frames as a strided view (no copy)
+    padded = np.pad(np.asarray(samples, dtype=np.float32), frame_length // 2)
+    n_frames = 1 + (len(padded) - frame_length) // hop_length
+    return np.lib.stride_tricks.as_strided(
+        padded,
+        shape=(n_frames, frame_length),
+        strides=(padded.strides[0] * hop_length, padded.strides[0]),
+        writeable=False
+    )
+
+# --------------------------------------------------
+# SHARED FEATURES
+# One framing and one STFT per clip; every liveness feature is derived
+# from them on first access and cached. Arrays are per frame.
+#   feats = clip.features()
+#   feats.rms, feats.flatness, feats.centroid, feats.rolloff()
+# --------------------------------------------------
+class AudioFeatures:
+
+    def __init__(self, samples, sample_rate, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.frames = frame_signal(samples, frame_length, hop_length)
+        self.magnitude = np.abs(fft.rfft(self.frames * hann(frame_length), axis=1))
+        self.freqs = np.linspace(0, sample_rate / 2, self.magnitude.shape[1], dtype=np.float32)
+        self._cache = {}
+
+    def _cached(self, name, compute):
+        value = self._cache.get(name)
+        if value is None:
+            value = self._cache[name] = compute()
+        return value
+
+    @property
+    def power(self):
+        return self._cached("power", lambda: self.magnitude ** 2)
+
+    @property
+    def rms(self):
+        # Time-domain RMS of the same frames (librosa.feature.rms)
+        return self._cached("rms", lambda: np.sqrt(np.mean(self.frames ** 2, axis=1)))
+
+    @property
+    def flatness(self):
+        # Geometric / arithmetic mean of the power spectrum (librosa.feature.spectral_flatness)
+        def compute():
+            power = np.maximum(self.power, AMIN)
+            return np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return self._cached("flatness", compute)
+
+    @property
+    def centroid(self):
+        # Magnitude-weighted mean frequency (librosa.feature.spectral_centroid)
+        def compute():
+            total = self.magnitude.sum(axis=1)
+            weighted = self.magnitude @ self.freqs
+            return np.divide(weighted, total, out=np.zeros_like(weighted), where=total > 0)
+        return self._cached("centroid", compute)
+
+    # ---------- replay-detection helpers ----------
+    def rolloff(self, roll_percent=0.85):
+        # Frequency below which roll_percent of each frame's energy lies
+        cumulative = np.cumsum(self.magnitude, axis=1)
+        target = roll_percent * cumulative[:, -1:]
+        index = np.minimum((cumulative < target).sum(axis=1), len(self.freqs) - 1)
+        return self.freqs[index]
+
+    def band_energy_ratio(self, low_hz, high_hz):
+        # Share of the clip's power in [low_hz, high_hz): loudspeaker replays
+        # tend to lose the lowest and highest bands
+        band = (self.freqs >= low_hz) & (self.freqs < high_hz)
+        total = self.power.sum()
+        return float(self.power[:, band].sum() / total) if total > 0 else 0.0
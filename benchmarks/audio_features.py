@@ -0,0 +1,78 @@
+import time
+import argparse
+import numpy as np
+
+from audio_clip import AudioClip, SAMPLE_RATE
+from audio_features import AudioFeatures
+
+# --------------------------------------------------
+# AUDIO LIVENESS FEATURE COST PER ATTEMPT
+# One shared STFT (audio_features.py) vs librosa's rms + spectral_flatness +
+# spectral_centroid, each framing/transforming the clip on its own.
+# The librosa columns (and the parity check) need librosa installed.
+# Run from the project root:
+#   python -m benchmarks.audio_features --durations 1 3 5
+# --------------------------------------------------
+def synthetic_clip(duration, rng):
+    # Voiced-ish: a few harmonics with vibrato plus breath noise
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = 140 * (1 + 0.02 * np.sin(2 * np.pi * 5 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    audio = 0.3 * voiced * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t)) + 0.01 * rng.standard_normal(len(t))
+    return AudioClip(np.clip(audio / 3, -1, 1) * 32767)
+
+def shared_stft(clip):
+    feats = AudioFeatures(clip.samples, clip.sample_rate)
+    return np.mean(feats.rms), np.mean(feats.flatness), np.var(feats.centroid)
+
+def librosa_features(clip):
+    import librosa
+
+    y, sr = clip.samples, clip.sample_rate
+    return (np.mean(librosa.feature.rms(y=y)),
+            np.mean(librosa.feature.spectral_flatness(y=y)),
+            np.var(librosa.feature.spectral_centroid(y=y, sr=sr)))
+
+def time_ms(fn, clip, repeats):
+    fn(clip)   # warm-up (FFT plans, librosa's lazy imports)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(clip)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times)), float(np.percentile(times, 95))
+
+def run(durations, repeats):
+    rng = np.random.default_rng(0)
+    try:
+        import librosa   # noqa: F401
+        have_librosa = True
+    except ImportError:
+        have_librosa = False
+        print("⚠️ librosa not installed: timing the shared STFT only\n")
+
+    print(f"{'clip s':>7} {'shared ms':>10} {'p95':>7} {'librosa ms':>11} {'p95':>7} {'speedup':>8}")
+    for duration in durations:
+        clip = synthetic_clip(duration, rng)
+        new_med, new_p95 = time_ms(shared_stft, clip, repeats)
+        if not have_librosa:
+            print(f"{duration:>7.1f} {new_med:>10.2f} {new_p95:>7.2f}")
+            continue
+
+        old_med, old_p95 = time_ms(librosa_features, clip, repeats)
+        print(f"{duration:>7.1f} {new_med:>10.2f} {new_p95:>7.2f} {old_med:>11.2f} {old_p95:>7.2f} "
+              f"{old_med / new_med:>7.1f}x")
+
+        # Same numbers as before, so the liveness thresholds are unchanged
+        new, old = shared_stft(clip), librosa_features(clip)
+        drift = [abs(a - b) / max(abs(b), 1e-12) for a, b in zip(new, old)]
+        print(f"{'':>7} relative diff rms {drift[0]:.1e}  flatness {drift[1]:.1e}  centroid var {drift[2]:.1e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Audio liveness feature extraction benchmark")
+    parser.add_argument("--durations", type=float, nargs="+", default=[1.0, 3.0, 5.0])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    run(args.durations, args.repeats)
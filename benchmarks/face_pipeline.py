@@ -0,0 +1,71 @@
+import json
+import argparse
+import numpy as np
+
+from face_verify import load_recognizer, create_detectors, run_pipeline
+from frame_sources import open_source
+
+# --------------------------------------------------
+# HEADLESS FACE PIPELINE BENCHMARK
+# Replays recorded sessions (video files or image folders) through the
+# verification pipeline and reports per-stage latency, FPS,
+# time-to-first-blink and time-to-grant.
+# Run from the project root:
+#   python -m benchmarks.face_pipeline sessions/alice.mp4 sessions/bob_frames/
+# --------------------------------------------------
+STAGES = ("capture", "detect", "landmarks", "recognize")
+
+def fmt(value, scale=1.0, unit=""):
+    return "-" if value is None else f"{value * scale:.1f}{unit}"
+
+def run(sessions, repeats, timeout, fps):
+    recognizer = load_recognizer()
+    if recognizer is None:
+        print("⚠️ Face model not found: recognition stage will not run")
+
+    reports = []
+    for session in sessions:
+        for attempt in range(repeats):
+            face_cascade, mesh = create_detectors()
+            source = open_source(session, fps=fps)
+            pipeline = run_pipeline(source, recognizer, face_cascade, mesh,
+                                    headless=True, timeout=timeout)
+            source.release()
+
+            report = pipeline.summary()
+            report["session"] = str(session)
+            report["attempt"] = attempt + 1
+            reports.append(report)
+
+            stages = "  ".join(
+                f"{stage} {fmt(report[f'{stage}_ms_mean'], unit='ms')}"
+                f"/{fmt(report[f'{stage}_ms_p95'], unit='ms')}"
+                for stage in STAGES
+            )
+            print(f"{session} #{attempt + 1}: {report['fps']:.1f} fps  "
+                  f"first blink {fmt(report['time_to_first_blink'], unit='s')}  "
+                  f"grant {fmt(report['time_to_grant'], unit='s')}  "
+                  f"result {report['result']}")
+            print(f"    mean/p95  {stages}")
+
+    grants = [r["time_to_grant"] for r in reports if r["time_to_grant"] is not None]
+    print(f"\nSessions granted: {len(grants)}/{len(reports)}")
+    if grants:
+        print(f"Time to grant: median {np.median(grants):.2f}s  max {max(grants):.2f}s")
+    return reports
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Face pipeline FPS/latency benchmark")
+    parser.add_argument("sessions", nargs="*", default=["synthetic:300"],
+                        help="video files, image folders or synthetic[:frames]")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--fps", type=float, default=None,
+                        help="replay rate (default: the recording's own rate)")
+    parser.add_argument("--json", help="write the per-session reports to this file")
+    args = parser.parse_args()
+
+    reports = run(args.sessions, args.repeats, args.timeout, args.fps)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=4)
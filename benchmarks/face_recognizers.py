@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+import cv2
+import numpy as np
+
+from face_store import FACE_SIZE
+from face_embeddings import EmbeddingRecognizer, embed_face
+from lbph_model import LBPHModel
+from model_registry import FACE_EMBEDDER_PATH
+
+# --------------------------------------------------
+# LBPH vs EMBEDDING RECOGNIZER SCALING BENCHMARK
+# Synthetic identities at several roster sizes: cv2 LBPH predict() and the
+# binary LBPHModel against every stored histogram, vs one cosine product
+# against per-identity centroids.
+# The SFace forward pass is timed separately when the ONNX model is present
+# (it does not depend on the roster size).
+# Run from the project root:
+#   python -m benchmarks.face_recognizers --sizes 100 1000 5000
+# --------------------------------------------------
+EMBEDDING_DIM = 128
+
+def synthetic_faces(n, rng):
+    # Smoothed noise: textured enough for LBP codes to vary between "faces"
+    width, height = FACE_SIZE
+    noise = rng.integers(0, 256, (n, height, width), dtype=np.uint8)
+    return [cv2.GaussianBlur(img, (5, 5), 0) for img in noise]
+
+def time_calls(fn, probes):
+    start = time.perf_counter()
+    for probe in probes:
+        fn(probe)
+    return (time.perf_counter() - start) / len(probes) * 1000
+
+def bench_lbph(identities, samples, probes, rng, write_yaml):
+    faces = synthetic_faces(identities * samples, rng)
+    labels = np.repeat(np.arange(identities), samples).astype(np.int32)
+
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    start = time.perf_counter()
+    recognizer.train(faces, labels)
+    train_s = time.perf_counter() - start
+
+    histograms = np.vstack(recognizer.getHistograms()).astype(np.float32)
+    report = {
+        "train_s": train_s,
+        "predict_ms": time_calls(recognizer.predict, probes),
+        "model_bytes": histograms.nbytes
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "face_model.npy")
+        np.save(path, histograms)
+        start = time.perf_counter()
+        model = LBPHModel(np.load(path, mmap_mode="r"), labels)
+        report["binary_load_s"] = time.perf_counter() - start
+        model.predict(probes[0])   # first call pages the histograms in
+        report["binary_predict_ms"] = time_calls(model.predict, probes)
+        del model
+
+        if write_yaml:
+            path = os.path.join(tmp, "face_model.yml")
+            recognizer.write(path)
+            report["yaml_bytes"] = os.path.getsize(path)
+            start = time.perf_counter()
+            cv2.face.LBPHFaceRecognizer_create().read(path)
+            report["yaml_load_s"] = time.perf_counter() - start
+    return report
+
+def bench_embedding(identities, samples, probes, rng):
+    embeddings = rng.standard_normal((identities * samples, EMBEDDING_DIM)).astype(np.float32)
+    labels = np.repeat(np.arange(identities), samples)
+
+    recognizer = EmbeddingRecognizer()
+    start = time.perf_counter()
+    for label in range(identities):
+        recognizer.add(label, embeddings[labels == label])
+    train_s = time.perf_counter() - start
+
+    probe_embeddings = rng.standard_normal((len(probes), EMBEDDING_DIM)).astype(np.float32)
+    return {
+        "train_s": train_s,   # centroid math only; embedding the crops is per-sample SFace time
+        "match_ms": time_calls(recognizer.match, probe_embeddings),
+        "model_bytes": recognizer.centroids.nbytes + recognizer.labels.nbytes
+    }
+
+def run(sizes, samples, n_probes, write_yaml, seed=0):
+    rng = np.random.default_rng(seed)
+    probes = synthetic_faces(n_probes, rng)
+
+    embed_ms = None
+    if os.path.exists(FACE_EMBEDDER_PATH):
+        embed_face(probes[0])   # load + warm the net
+        embed_ms = time_calls(embed_face, probes)
+        print(f"SFace forward pass: {embed_ms:.2f} ms/probe (independent of roster size)")
+    else:
+        print(f"⚠️ {FACE_EMBEDDER_PATH} not found: embedding column is matching only")
+
+    results = []
+    print(f"\n{'identities':>10} {'LBPH ms':>9} {'binary ms':>10} {'LBPH MB':>9} "
+          f"{'emb ms':>9} {'emb MB':>9} {'speedup':>8}")
+    for identities in sizes:
+        lbph = bench_lbph(identities, samples, probes, rng, write_yaml)
+        emb = bench_embedding(identities, samples, probes, rng)
+        emb_total = emb["match_ms"] + (embed_ms or 0.0)
+
+        results.append({"identities": identities, "samples": samples,
+                        "lbph": lbph, "embedding": dict(emb, embed_ms=embed_ms)})
+        print(f"{identities:>10} {lbph['predict_ms']:>9.2f} {lbph['binary_predict_ms']:>10.2f} "
+              f"{lbph['model_bytes'] / 1e6:>9.1f} "
+              f"{emb_total:>9.3f} {emb['model_bytes'] / 1e6:>9.3f} "
+              f"{lbph['predict_ms'] / emb_total:>7.0f}x")
+        if "yaml_load_s" in lbph:
+            print(f"{'':>10} load: YAML {lbph['yaml_load_s']:.2f}s ({lbph['yaml_bytes'] / 1e6:.1f} MB)"
+                  f" vs binary {lbph['binary_load_s'] * 1000:.1f} ms")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LBPH vs embedding recognizer benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--samples", type=int, default=1, help="training crops per identity")
+    parser.add_argument("--probes", type=int, default=20)
+    parser.add_argument("--yaml", action="store_true", help="also write/read face_model.yml (slow, large)")
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.samples, args.probes, args.yaml)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,88 @@
+import time
+import argparse
+import numpy as np
+
+import voice_index
+from voice_index import VoiceMatrix, IVFIndex, normalize
+
+# --------------------------------------------------
+# RECALL VS LATENCY: IVF INDEX AGAINST BRUTE FORCE
+# Run from the project root: python -m benchmarks.voice_ann
+# --------------------------------------------------
+DIM = 192
+SAMPLES = 5
+
+def synthetic_store(n_identities, rng, groups=64, spread=0.6, noise=0.35):
+    # Identities cluster loosely (accent/gender-like groups) so the coarse
+    # quantizer has some structure to find, as with real ECAPA embeddings
+    group_means = normalize(rng.normal(size=(groups, DIM)))
+    group = rng.integers(groups, size=n_identities)
+    centers = normalize(group_means[group] + spread * normalize(rng.normal(size=(n_identities, DIM))))
+
+    store = {}
+    for i, center in enumerate(centers):
+        samples = normalize(center + noise * normalize(rng.normal(size=(SAMPLES, DIM))))
+        store[str(i)] = {
+            f"sample_{j}.wav": {"sha1": f"{i}-{j}", "embedding": samples[j]}
+            for j in range(SAMPLES)
+        }
+    return store, centers
+
+def probes_for(centers, n_probes, rng, noise=0.35):
+    truth = rng.integers(len(centers), size=n_probes)
+    probes = normalize(centers[truth] + noise * normalize(rng.normal(size=(n_probes, DIM))))
+    return probes, truth
+
+def timed(fn, probes):
+    results, latencies = [], []
+    for probe in probes:
+        start = time.perf_counter()
+        results.append(fn(probe))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, np.array(latencies)
+
+def run(sizes, n_probes, probe_settings, k):
+    rng = np.random.default_rng(0)
+    print(f"{'enrolled':>9} {'method':>16} {'recall@1':>9} {'recall@k':>9} "
+          f"{'mean ms':>8} {'p95 ms':>8}")
+
+    for size in sizes:
+        store, centers = synthetic_store(size, rng)
+        probes, _ = probes_for(centers, n_probes, rng)
+
+        matrix = VoiceMatrix(store)
+        exact, latencies = timed(lambda p: matrix.top_k(p, k), probes)
+        print(f"{size:>9} {'brute force':>16} {1.0:>9.3f} {1.0:>9.3f} "
+              f"{latencies.mean():>8.3f} {np.percentile(latencies, 95):>8.3f}")
+
+        start = time.perf_counter()
+        index = IVFIndex()
+        for faculty_id, entries in store.items():
+            index.insert(faculty_id, [e["embedding"] for e in entries.values()])
+        index.train()
+        build_s = time.perf_counter() - start
+
+        for n_probe in probe_settings:
+            index.n_probe = n_probe
+            approx, latencies = timed(lambda p: index.search(p, k), probes)
+
+            top1 = np.mean([a[0][0] == e[0][0] for a, e in zip(approx, exact)])
+            topk = np.mean([
+                len({fid for fid, _ in a} & {fid for fid, _ in e}) / len(e)
+                for a, e in zip(approx, exact)
+            ])
+            label = f"ivf nprobe={n_probe}"
+            print(f"{size:>9} {label:>16} {top1:>9.3f} {topk:>9.3f} "
+                  f"{latencies.mean():>8.3f} {np.percentile(latencies, 95):>8.3f}")
+
+        print(f"{size:>9} {'ivf build (s)':>16} {build_s:>9.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Voice ANN recall vs latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 20000])
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, voice_index.N_PROBE, 16])
+    parser.add_argument("--k", type=int, default=voice_index.TOP_K)
+    args = parser.parse_args()
+
+    run(args.sizes, args.probes, args.nprobe, args.k)
@@ -0,0 +1,265 @@
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import contextlib
+import multiprocessing
+import numpy as np
+from scipy.io import wavfile
+from scipy.signal import lfilter
+
+# --------------------------------------------------
+# VOICE IDENTIFICATION SCALING BENCHMARK
+# Builds a synthetic roster (voices/<id>/sample_*.wav + database.json) per
+# size, enrolls it through sync_store, then replays probe WAVs through
+# verify_against_database with the microphone bypassed. Each size runs in a
+# fresh process so peak RSS belongs to that roster alone.
+# Vosk is bypassed (the probe's phrase is passed as already recognized);
+# liveness, ECAPA embedding and identification run as in production.
+# Run from the project root:
+#   python -m benchmarks.voice_scaling --sizes 10 100 1000 5000 --save baseline
+#   python -m benchmarks.voice_scaling --sizes 10 100 --compare benchmarks/baselines/voice_scaling_baseline.json
+# --------------------------------------------------
+SAMPLE_RATE = 16000
+BASELINE_DIR = os.path.join("benchmarks", "baselines")
+PHRASE = "hello professor"
+
+# ---------------- SYNTHETIC VOICES ----------------
+def voice_params(rng):
+    # Pitch and three formants per speaker: enough for ECAPA to separate them
+    return {
+        "f0": rng.uniform(85, 255),
+        "formants": np.sort(rng.uniform([300, 900, 2200], [900, 2300, 3400])),
+        "tilt": rng.uniform(0.85, 0.97)
+    }
+
+def resonator(signal, freq, bandwidth=90.0):
+    r = np.exp(-np.pi * bandwidth / SAMPLE_RATE)
+    theta = 2 * np.pi * freq / SAMPLE_RATE
+    return lfilter([1 - r], [1, -2 * r * np.cos(theta), r * r], signal)
+
+def synth_utterance(params, duration, rng):
+    n = int(duration * SAMPLE_RATE)
+    t = np.arange(n) / SAMPLE_RATE
+
+    # Glottal pulse train with vibrato and jitter, shaped into syllables
+    f0 = params["f0"] * (1 + 0.03 * np.sin(2 * np.pi * rng.uniform(4, 6) * t)
+                         + 0.01 * rng.standard_normal(n).cumsum() / np.sqrt(n))
+    phase = np.cumsum(f0) / SAMPLE_RATE
+    source = lfilter([1], [1, -params["tilt"]], np.diff(np.floor(phase), prepend=0.0))
+
+    voiced = sum(resonator(source, f) for f in params["formants"])
+    syllables = np.clip(np.sin(np.pi * rng.uniform(3, 5) * t + rng.uniform(0, np.pi)), 0, None)
+    audio = voiced * syllables + 0.002 * rng.standard_normal(n)
+    return (audio / (np.abs(audio).max() + 1e-9) * 0.6 * 32767).astype(np.int16)
+
+def build_roster(workdir, size, samples, duration, n_probes, seed):
+    manifest_path = os.path.join(workdir, "manifest.json")
+    manifest = {"size": size, "samples": samples, "duration": duration,
+                "probes": n_probes, "seed": seed}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            if json.load(f).get("roster") == manifest:
+                return   # reuse a tree generated with the same settings
+
+    rng = np.random.default_rng(seed)
+    speakers = [voice_params(rng) for _ in range(size)]
+    db = {}
+    for i, params in enumerate(speakers, 1):
+        faculty_id = str(i)
+        voice_dir = os.path.join("voices", faculty_id)
+        os.makedirs(os.path.join(workdir, voice_dir), exist_ok=True)
+        for j in range(1, samples + 1):
+            wavfile.write(os.path.join(workdir, voice_dir, f"sample_{j}.wav"),
+                          SAMPLE_RATE, synth_utterance(params, duration, rng))
+        db[faculty_id] = {
+            "name": f"Synthetic Speaker {i}",
+            "department": "BENCHMARK",
+            "face_path": f"faces/{faculty_id}",
+            "voice_path": f"voices/{faculty_id}"
+        }
+
+    # Probes are fresh utterances of enrolled speakers
+    os.makedirs(os.path.join(workdir, "probes"), exist_ok=True)
+    truth = rng.integers(1, size + 1, size=n_probes)
+    for k, faculty_id in enumerate(truth):
+        wavfile.write(os.path.join(workdir, "probes", f"probe_{k}.wav"), SAMPLE_RATE,
+                      synth_utterance(speakers[faculty_id - 1], duration, rng))
+
+    with open(os.path.join(workdir, "database.json"), "w") as f:
+        json.dump(db, f, indent=4)
+    with open(manifest_path, "w") as f:
+        json.dump({"roster": manifest, "truth": [str(t) for t in truth]}, f)
+
+    # The embedding store belongs to the old tree
+    for stale in ("voice_embeddings.npz", "voice_index.npz"):
+        if os.path.exists(os.path.join(workdir, stale)):
+            os.remove(os.path.join(workdir, stale))
+
+# ---------------- MEASUREMENT ----------------
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:   # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1e6
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3   # bytes vs KiB
+
+def percentiles(values):
+    values = np.asarray(values) * 1000
+    report = {f"p{q}_ms": float(np.percentile(values, q)) for q in (50, 90, 95, 99)}
+    report.update(mean_ms=float(values.mean()), max_ms=float(values.max()))
+    return report
+
+def run_size(task):
+    # Runs in a fresh process, inside the size's work directory
+    workdir, size, samples, duration, n_probes, seed, concurrency = task
+    build_roster(workdir, size, samples, duration, n_probes, seed)
+
+    # The ECAPA download is shared by every size: pin it to the project root
+    import model_registry
+    model_registry.SPEAKER_SAVEDIR = os.path.abspath(model_registry.SPEAKER_SAVEDIR)
+    os.chdir(workdir)
+
+    import metrics
+    import faculty_db
+    from audio_clip import load_audio
+    from voice_embeddings import sync_store
+    from voice_verify import verify_against_database
+    from concurrent.futures import ThreadPoolExecutor
+
+    with open("manifest.json") as f:
+        truth = json.load(f)["truth"]
+    clips = [load_audio(os.path.join("probes", f"probe_{k}.wav")) for k in range(len(truth))]
+
+    faculty_db.use_backend("json")   # re-read database.json from this directory
+    db = faculty_db.get_db()
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    # Enrollment (ECAPA over every sample) is timed on its own; probes then
+    # only embed themselves and score against the store
+    start = time.perf_counter()
+    with quiet:
+        sync_store(db)
+    enroll_s = time.perf_counter() - start
+
+    with quiet:
+        verify_against_database(PHRASE, clips[0], PHRASE)   # warm-up: models, matrix, index
+    metrics.reset()
+
+    def attempt(clip):
+        t0 = time.perf_counter()
+        result = verify_against_database(PHRASE, clip, PHRASE)
+        return result, time.perf_counter() - t0
+
+    start = time.perf_counter()
+    with quiet, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(attempt, clips))
+    wall_s = time.perf_counter() - start
+
+    latencies = [seconds for _, seconds in outcomes]
+    correct = sum(str(result) == fid for (result, _), fid in zip(outcomes, truth))
+    return {
+        "enrollees": size,
+        "samples": samples,
+        "probes": len(clips),
+        "concurrency": concurrency,
+        "enroll_s": enroll_s,
+        "latency": percentiles(latencies),
+        "throughput_per_s": len(clips) / wall_s,
+        "accuracy": correct / len(clips),
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": metrics.summary()["stages"]
+    }
+
+# ---------------- REPORTING ----------------
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+def fmt_row(r):
+    rss = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}"
+    lat = r["latency"]
+    return (f"{r['enrollees']:>9} {r['enroll_s']:>9.1f} {lat['p50_ms']:>8.1f} {lat['p95_ms']:>8.1f} "
+            f"{lat['p99_ms']:>8.1f} {r['throughput_per_s']:>9.2f} {rss:>8} {r['accuracy']:>6.2f}")
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {r["enrollees"]: r for r in json.load(f)["results"]}
+
+    print(f"\nvs {baseline_path}")
+    print(f"{'enrolled':>9} {'p50':>9} {'p95':>9} {'tput':>9} {'rss':>9}")
+    for r in results:
+        old = baseline.get(r["enrollees"])
+        if old is None:
+            continue
+
+        def delta(new, prev):
+            if new is None or prev in (None, 0):
+                return "-"
+            return f"{(new - prev) / prev * 100:+.0f}%"
+
+        print(f"{r['enrollees']:>9} "
+              f"{delta(r['latency']['p50_ms'], old['latency']['p50_ms']):>9} "
+              f"{delta(r['latency']['p95_ms'], old['latency']['p95_ms']):>9} "
+              f"{delta(r['throughput_per_s'], old['throughput_per_s']):>9} "
+              f"{delta(r['peak_rss_mb'], old['peak_rss_mb']):>9}")
+
+def run(sizes, samples, duration, n_probes, concurrency, workdir, seed=0):
+    # spawn: every size starts from an empty process (clean RSS, cold caches)
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+
+    print(f"{'enrolled':>9} {'enroll s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'probes/s':>9} {'RSS MB':>8} {'acc':>6}")
+    for size in sizes:
+        size_dir = os.path.abspath(os.path.join(workdir, f"roster_{size}"))
+        os.makedirs(size_dir, exist_ok=True)
+        with ctx.Pool(1) as pool:
+            result = pool.apply(run_size, ((size_dir, size, samples, duration,
+                                            n_probes, seed, concurrency),))
+        results.append(result)
+        print(fmt_row(result))
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Voice identification scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--samples", type=int, default=3, help="enrollment WAVs per speaker")
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per WAV")
+    parser.add_argument("--probes", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=1, help="probes verified at once")
+    parser.add_argument("--workdir", default=os.path.join("benchmarks", "voice_rosters"),
+                        help="synthetic trees are kept here and reused between runs")
+    parser.add_argument("--save", metavar="LABEL",
+                        help=f"write {BASELINE_DIR}/voice_scaling_LABEL.json")
+    parser.add_argument("--compare", metavar="JSON", help="baseline file to diff against")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.samples, args.duration, args.probes,
+                  args.concurrency, args.workdir)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"voice_scaling_{args.save}.json")
+        with open(path, "w") as f:
+            json.dump({"environment": environment(), "args": vars(args), "results": results}, f, indent=2)
+        print(f"\n💾 Baseline saved to {path}")
+
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,175 @@
+import os
+import json
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+
+import faculty_db
+from admin import generate_faculty_id, FACE_DIR, VOICE_DIR
+from face_store import append_faces
+from face_capture import SampleGate
+from face_train import train as face_train
+from voice_embeddings import load_store, save_store, refresh_faculty
+from voice_index import get_index
+
+# --------------------------------------------------
+# BULK OFFLINE ENROLLMENT
+# root/
+#   Jane_Doe/            -> name "Jane Doe"
+#     info.json          optional {"name": ..., "department": ...}
+#     *.jpg / *.png      face photos (any depth)
+#     *.wav              voice samples (any depth)
+# Faces are cropped and voices embedded in a process pool; the face model is
+# retrained once at the end and the database is saved once.
+# --------------------------------------------------
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+def find_people(root, department="Unknown"):
+    people = []
+    for entry in sorted(os.listdir(root)):
+        folder = os.path.join(root, entry)
+        if not os.path.isdir(folder):
+            continue
+
+        info = {"name": entry.replace("_", " "), "department": department}
+        info_file = os.path.join(folder, "info.json")
+        if os.path.exists(info_file):
+            with open(info_file, "r") as f:
+                info.update(json.load(f))
+
+        images, wavs = [], []
+        for dirpath, _, files in os.walk(folder):
+            for fname in sorted(files):
+                path = os.path.join(dirpath, fname)
+                if fname.lower().endswith(IMAGE_EXTENSIONS):
+                    images.append(path)
+                elif fname.lower().endswith(".wav"):
+                    wavs.append(path)
+
+        people.append(dict(info, images=images, wavs=wavs))
+    return people
+
+# ---------------- POOL WORKERS (one model load per process) ----------------
+_cascade = None
+
+def crop_faces(paths):
+    global _cascade
+    if _cascade is None:
+        _cascade = cv2.CascadeClassifier(
+            cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+        )
+
+    # Same quality gate as camera enrollment: one sharp, large, distinct face
+    gate = SampleGate()
+    crops = []
+    for path in paths:
+        gray = cv2.imread(path, 0)
+        if gray is None:
+            continue
+        crop = gate.check(gray, _cascade.detectMultiScale(gray, 1.3, 5))
+        if crop is not None:
+            crops.append(crop)
+    return crops
+
+def embed_voices(faculty_id, voice_dir):
+    store = {}
+    refresh_faculty(store, faculty_id, voice_dir)
+    return store.get(faculty_id, {})
+
+# ---------------- IMPORT ----------------
+def bulk_enroll(root, department="Unknown", workers=WORKERS):
+    db = faculty_db.load_db()
+    people = []
+    seen = set()   # names taken earlier in this batch (not in the index yet)
+
+    for person in find_people(root, department):
+        if not person["images"] and not person["wavs"]:
+            print(f"⚠️ Skipped {person['name']}: no images or WAV files")
+            continue
+        if faculty_db.find_by_name(person["name"]):
+            print(f"⚠️ Skipped {person['name']}: already enrolled")
+            continue
+        if person["name"].lower() in seen:
+            print(f"⚠️ Skipped {person['name']}: listed twice in this import")
+            continue
+        seen.add(person["name"].lower())
+
+        faculty_id = generate_faculty_id(db)
+        db[faculty_id] = {
+            "name": person["name"],
+            "department": person["department"],
+            "face_path": f"{FACE_DIR}/{faculty_id}",
+            "voice_path": f"{VOICE_DIR}/{faculty_id}"
+        }
+
+        # Voice samples are copied in so later syncs find them where the store expects
+        voice_dir = f"{VOICE_DIR}/{faculty_id}"
+        os.makedirs(voice_dir, exist_ok=True)
+        for i, wav in enumerate(person["wavs"], 1):
+            shutil.copy2(wav, f"{voice_dir}/sample_{i}.wav")
+
+        people.append((faculty_id, person))
+
+    if not people:
+        print("Nothing to import.")
+        return []
+
+    added_faces = added_voices = 0
+    print(f"📥 Importing {len(people)} faculty with {workers} worker processes...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        face_jobs = {fid: pool.submit(crop_faces, p["images"]) for fid, p in people if p["images"]}
+        voice_jobs = {
+            fid: pool.submit(embed_voices, fid, f"{VOICE_DIR}/{fid}")
+            for fid, p in people if p["wavs"]
+        }
+
+        for faculty_id, job in face_jobs.items():
+            crops = job.result()
+            if not crops:
+                print(f"⚠️ Faculty ID {faculty_id}: no usable face in any image")
+                continue
+            folder = f"{FACE_DIR}/{faculty_id}"
+            os.makedirs(folder, exist_ok=True)
+            for i, crop in enumerate(crops, 1):
+                cv2.imwrite(f"{folder}/{i}.jpg", crop)
+            append_faces(faculty_id, crops)
+            added_faces += 1
+
+        store = load_store()
+        for faculty_id, job in voice_jobs.items():
+            entries = job.result()
+            if entries:
+                store[faculty_id] = entries
+                added_voices += 1
+            else:
+                print(f"⚠️ Faculty ID {faculty_id}: no usable voice samples")
+
+    if added_voices:
+        save_store(store)
+        # Only warms voice_index.npz: once the roster reaches ANN_MIN_IDENTITIES
+        # the coarse cells are trained and saved here, so verifier processes
+        # started later load them instead of running k-means on a probe.
+        # (Running verifiers keep their own index and sync it themselves.)
+        get_index(store)
+    faculty_db.save_db(db)
+
+    if added_faces:
+        print("\n🔄 Training face model once for the whole batch...")
+        face_train()
+
+    for faculty_id, person in people:
+        print(f"✅ ID {faculty_id}: {person['name']} ({person['department']})")
+    return [faculty_id for faculty_id, _ in people]
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Enroll faculty from a directory tree")
+    parser.add_argument("root", help="one sub-folder of images/WAVs per person")
+    parser.add_argument("--department", default="Unknown", help="default department")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    bulk_enroll(args.root, args.department, args.workers)
@@ -0,0 +1,244 @@
+import time
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+
+import metrics
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+BAUD_RATE = 9600
+RESET_WAIT = 2.0        # the board resets on open; wait for "Arduino ready" at most this long
+ACK_TIMEOUT = 1.0       # seconds for "UNLOCKING DOOR" after a command is written
+LOCK_TIMEOUT = 30.0     # seconds for "DOOR LOCKED" after the ack
+STALE_AFTER = 3.0       # queued commands older than this are dropped, never sent late
+POLL_INTERVAL = 0.01
+RECONNECT_MIN, RECONNECT_MAX = 0.5, 10.0
+LATENCY_WINDOW = 500
+
+# Firmware lines (door_lock_demo.ino)
+READY_LINE = "Arduino ready"
+ACK_LINE = "UNLOCKING DOOR"
+LOCKED_LINE = "DOOR LOCKED"
+
+# --------------------------------------------------
+# COMMANDS
+# --------------------------------------------------
+class UnlockCommand:
+    # status: queued -> sent -> acked -> locked, or expired / timeout
+
+    def __init__(self):
+        self.status = "queued"
+        self.queued_at = time.perf_counter()
+        self.sent_at = None
+        self.acked_at = None
+        self.locked_at = None
+        self.acked = threading.Event()
+        self.finished = threading.Event()
+
+    def ack_ms(self):
+        return None if self.acked_at is None else (self.acked_at - self.queued_at) * 1000
+
+    def wait(self, timeout=None):
+        self.finished.wait(timeout)
+        return self.status
+
+# --------------------------------------------------
+# CONTROLLER
+# One background thread owns the port: it connects (and reconnects with
+# backoff), writes queued commands and matches firmware lines to them in
+# order. Callers only ever enqueue.
+# --------------------------------------------------
+class DoorController:
+
+    def __init__(self, port, baud_rate=BAUD_RATE, name=None,
+                 ack_timeout=ACK_TIMEOUT, reset_wait=RESET_WAIT):
+        self.port = port
+        self.baud_rate = baud_rate
+        self.prefix = f"[{name}] " if name else ""
+        self.label = name or str(port)   # "door" label in metrics.py
+        self.ack_timeout = ack_timeout
+        self.reset_wait = reset_wait
+
+        self.commands = queue.Queue()
+        self.awaiting_ack = deque()
+        self.awaiting_lock = deque()
+        self.serial = None
+        self.ready_at = None
+        self.buffer = b""
+
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.counts = {"sent": 0, "acked": 0, "locked": 0, "timeout": 0, "expired": 0, "reconnects": 0}
+        self.ack_latencies = deque(maxlen=LATENCY_WINDOW)
+
+    # ---------- public API ----------
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name=f"door-serial-{self.port}", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join(timeout=2)
+        self._close()
+
+    @property
+    def connected(self):
+        return self.serial is not None
+
+    def unlock(self):
+        command = UnlockCommand()
+        self.commands.put(command)
+        return command
+
+    def metrics(self):
+        ms = np.array(self.ack_latencies)
+        return dict(
+            self.counts,
+            connected=self.connected,
+            ack_ms_p50=float(np.percentile(ms, 50)) if len(ms) else None,
+            ack_ms_p95=float(np.percentile(ms, 95)) if len(ms) else None
+        )
+
+    # ---------- connection ----------
+    def _connect(self):
+        import serial
+
+        port = serial.serial_for_url(self.port, self.baud_rate, timeout=0)
+        self.serial = port
+        self.buffer = b""
+        self.ready_at = time.perf_counter() + self.reset_wait
+        print(f"🔌 {self.prefix}Arduino connected on {self.port}")
+
+    def _close(self):
+        if self.serial is not None:
+            try:
+                self.serial.close()
+            except Exception:
+                pass
+        self.serial = None
+
+    def _count(self, event, seconds=None):
+        # Kept locally for metrics() and exported through metrics.py
+        self.counts[event] += 1
+        metrics.record_door_event(self.label, event, seconds)
+
+    def _fail(self, command, status):
+        command.status = status
+        self._count(status)
+        command.acked.set()
+        command.finished.set()
+
+    def _drop_in_flight(self, status):
+        while self.awaiting_ack:
+            self._fail(self.awaiting_ack.popleft(), status)
+        while self.awaiting_lock:
+            command = self.awaiting_lock.popleft()
+            command.finished.set()
+
+    # ---------- background loop ----------
+    def _run(self):
+        backoff = RECONNECT_MIN
+        while not self.stop_event.is_set():
+            if self.serial is None:
+                try:
+                    self._connect()
+                    backoff = RECONNECT_MIN
+                except Exception as e:
+                    if backoff == RECONNECT_MIN:   # once per outage, not per retry
+                        print(f"⚠️ {self.prefix}Arduino not connected: {e} (retrying in the background)")
+                    self._expire_queued(wait=backoff)
+                    backoff = min(backoff * 2, RECONNECT_MAX)
+                    continue
+
+            try:
+                self._send_pending()
+                self._read_lines()
+                self._check_timeouts()
+            except Exception as e:
+                print(f"⚠️ {self.prefix}Arduino link lost: {e}")
+                self._close()
+                self._drop_in_flight("timeout")
+                self._count("reconnects")
+
+    def _expire_queued(self, wait):
+        # While disconnected, drop anything that would now open the door late
+        deadline = time.perf_counter() + wait
+        while not self.stop_event.is_set() and time.perf_counter() < deadline:
+            try:
+                command = self.commands.get(timeout=min(0.1, max(0.0, deadline - time.perf_counter())))
+            except queue.Empty:
+                continue
+            if time.perf_counter() - command.queued_at > STALE_AFTER:
+                self._fail(command, "expired")
+            else:
+                self.commands.put(command)
+                self.stop_event.wait(0.05)
+
+    def _send_pending(self):
+        if self.ready_at is not None and time.perf_counter() < self.ready_at:
+            self.stop_event.wait(POLL_INTERVAL)
+            return
+        self.ready_at = None
+
+        try:
+            command = self.commands.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            return
+
+        if time.perf_counter() - command.queued_at > STALE_AFTER:
+            self._fail(command, "expired")
+            return
+
+        self.serial.write(b"UNLOCK\n")
+        command.status = "sent"
+        command.sent_at = time.perf_counter()
+        self._count("sent")
+        self.awaiting_ack.append(command)
+
+    def _read_lines(self):
+        waiting = self.serial.in_waiting
+        if waiting:
+            self.buffer += self.serial.read(waiting)
+
+        while b"\n" in self.buffer:
+            raw, self.buffer = self.buffer.split(b"\n", 1)
+            self._handle_line(raw.decode("ascii", errors="ignore").strip())
+
+    def _handle_line(self, line):
+        now = time.perf_counter()
+
+        if line == READY_LINE:
+            self.ready_at = None
+        elif line == ACK_LINE and self.awaiting_ack:
+            command = self.awaiting_ack.popleft()
+            command.status = "acked"
+            command.acked_at = now
+            self._count("acked", command.ack_ms() / 1000)
+            self.ack_latencies.append(command.ack_ms())
+            command.acked.set()
+            self.awaiting_lock.append(command)
+            print(f"🔓 {self.prefix}Door unlocked (ack after {command.ack_ms():.0f} ms)")
+        elif line == LOCKED_LINE:
+            # One relock closes every unlock it covered (re-unlocks extend the window)
+            while self.awaiting_lock:
+                command = self.awaiting_lock.popleft()
+                command.status = "locked"
+                command.locked_at = now
+                self._count("locked")
+                command.finished.set()
+            print(f"🔒 {self.prefix}Door locked")
+
+    def _check_timeouts(self):
+        now = time.perf_counter()
+        while self.awaiting_ack and now - self.awaiting_ack[0].sent_at > self.ack_timeout:
+            command = self.awaiting_ack.popleft()
+            self._fail(command, "timeout")
+            print(f"⚠️ {self.prefix}No unlock acknowledgement within {self.ack_timeout:.1f}s")
+        while self.awaiting_lock and now - self.awaiting_lock[0].acked_at > LOCK_TIMEOUT:
+            self.awaiting_lock.popleft().finished.set()
@@ -6,6 +6,8 @@
 #define UNLOCK_TIME 5000  // milliseconds (5 seconds)
 
 String command = "";
+bool unlocked = false;
+unsigned long unlockedAt = 0;
 
 void setup() {
   Serial.begin(9600);
@@ -16,6 +18,8 @@ void setup() {
 }
 
 void loop() {
+  // Never blocks: commands are read while the door is open, and the
+  // relock happens here once UNLOCK_TIME has passed
   while (Serial.available()) {
     char c = Serial.read();
     if (c == '\n') {
@@ -26,6 +30,12 @@ void loop() {
       command += c;
     }
   }
+
+  if (unlocked && millis() - unlockedAt >= UNLOCK_TIME) {
+    digitalWrite(RELAY_PIN, LOW);    // Relock
+    unlocked = false;
+    Serial.println("DOOR LOCKED");
+  }
 }
 
 void handleCommand(String cmd) {
@@ -36,8 +46,7 @@ void handleCommand(String cmd) {
 
 void unlockDoor() {
   Serial.println("UNLOCKING DOOR");
-  digitalWrite(RELAY_PIN, HIGH);   // Unlock
-  delay(UNLOCK_TIME);
-  digitalWrite(RELAY_PIN, LOW);    // Relock
-  Serial.println("DOOR LOCKED");
+  digitalWrite(RELAY_PIN, HIGH);   // Unlock (a repeat UNLOCK extends the window)
+  unlocked = true;
+  unlockedAt = millis();
 }
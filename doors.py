@@ -0,0 +1,79 @@
+import os
+import json
+import threading
+
+import cv2
+
+from face_verify import verify_doors
+from face_train import prepare_model
+from access_log import log_access
+from door_controller import DoorController, BAUD_RATE
+from faculty_db import get_faculty_info, get_db
+import metrics
+
+# --------------------------------------------------
+# CONFIG
+# doors.json: [{"name": "room-101", "source": 0, "serial_port": "COM4"}, ...]
+# "source" is anything open_source() accepts (camera index, video, folder)
+# --------------------------------------------------
+DOORS_FILE = "doors.json"
+METRICS_PROM = "metrics-doors.prom"   # stage metrics written on shutdown
+METRICS_JSON = "metrics-doors.json"
+
+def load_doors(path=DOORS_FILE):
+    with open(path, "r") as f:
+        return json.load(f)
+
+# --------------------------------------------------
+# RUN EVERY DOOR FROM ONE PROCESS
+# --------------------------------------------------
+def run_doors(doors, session_timeout=None):
+    get_db()
+    prepare_model()   # door sessions only check the model file's stat
+
+    # Each door thread already runs in parallel; stop OpenCV from also
+    # spreading every call over all cores and oversubscribing them
+    cv2.setNumThreads(max(1, (os.cpu_count() or 1) // len(doors)))
+
+    controllers = {
+        door["name"]: DoorController(door["serial_port"], BAUD_RATE, name=door["name"]).start()
+        for door in doors if door.get("serial_port")
+    }
+
+    def on_result(name, faculty_id):
+        if faculty_id is None:
+            print(f"\n❌ [{name}] ACCESS DENIED")
+            log_access(None, "FACE", "DENIED", door=name)
+            return
+
+        faculty_name, department = get_faculty_info(faculty_id)
+        print(f"\n🔓 [{name}] ACCESS GRANTED: {faculty_name} ({department}), ID {faculty_id}")
+        log_access(faculty_id, "FACE", "GRANTED", door=name)
+        if name in controllers:
+            controllers[name].unlock()
+
+    stop_event = threading.Event()
+    options = {} if session_timeout is None else {"session_timeout": session_timeout}
+    threads = verify_doors(
+        {door["name"]: door["source"] for door in doors}, on_result, stop_event, **options
+    )
+    print(f"🟦 Watching {len(threads)} door(s)")
+
+    try:
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        print("\nStopping doors...")
+        stop_event.set()
+        for thread in threads:
+            thread.join(timeout=2)
+    finally:
+        for controller in controllers.values():
+            controller.stop()
+        metrics.export(METRICS_PROM, METRICS_JSON)
+
+if __name__ == "__main__":
+    import sys
+
+    run_doors(load_doors(sys.argv[1] if len(sys.argv) > 1 else DOORS_FILE))
@@ -1,38 +1,119 @@
 import cv2
 import os
+import numpy as np
+from collections import Counter
 
-def capture(faculty_id):
+from face_store import append_faces, normalize_crop
+from frame_sources import open_source
+
+# ---------------- QUALITY GATE ----------------
+TARGET_SAMPLES = 30
+MIN_FACE_SIZE = 80          # px, smaller detections are too coarse for LBPH
+MIN_SHARPNESS = 50.0        # variance of the Laplacian on the normalized crop
+MAX_HASH_DISTANCE = 6       # dHash bits; this close to a kept crop = near-duplicate
+MAX_FRAMES = 900            # give up after ~30s of frames without enough samples
+
+def sharpness(crop):
+    return cv2.Laplacian(crop, cv2.CV_64F).var()
+
+def dhash(crop, size=8):
+    # 64-bit difference hash: sign of horizontal gradients on a 9x8 thumbnail
+    small = cv2.resize(crop, (size + 1, size), interpolation=cv2.INTER_AREA)
+    return np.packbits((small[:, 1:] > small[:, :-1]).ravel())
+
+class SampleGate:
+    # Keeps a crop only if it is a single, large, sharp face that differs
+    # from every crop kept so far
+
+    def __init__(self, min_size=MIN_FACE_SIZE, min_sharpness=MIN_SHARPNESS,
+                 max_distance=MAX_HASH_DISTANCE):
+        self.min_size = min_size
+        self.min_sharpness = min_sharpness
+        self.max_distance = max_distance
+        self.hashes = np.zeros((0, 8), np.uint8)
+        self.rejected = Counter()
+
+    def check(self, gray, faces):
+        if len(faces) != 1:
+            return self._reject("no single face")
+
+        x, y, w, h = faces[0]
+        if min(w, h) < self.min_size:
+            return self._reject("too small")
+
+        crop = normalize_crop(gray[y:y+h, x:x+w])
+        if sharpness(crop) < self.min_sharpness:
+            return self._reject("blurry")
+
+        digest = dhash(crop)
+        if len(self.hashes):
+            distances = np.unpackbits(self.hashes ^ digest, axis=1).sum(axis=1)
+            if distances.min() <= self.max_distance:
+                return self._reject("near-duplicate")
+
+        self.hashes = np.vstack([self.hashes, digest])
+        return crop
+
+    def _reject(self, reason):
+        self.rejected[reason] += 1
+        return None
+
+    def report(self):
+        return ", ".join(f"{n} {reason}" for reason, n in self.rejected.most_common()) or "none"
+
+def capture(faculty_id, source=0, headless=False):
     save_path = f"faces/{faculty_id}"
     os.makedirs(save_path, exist_ok=True)
 
-    cap = cv2.VideoCapture(0)
+    cap = open_source(source)
     face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades +
                                          "haarcascade_frontalface_default.xml")
 
     count = 0
-    print("Starting face capture. Press 'q' to stop.")
+    frames = 0
+    crops = []
+    gate = SampleGate()
+    print("Starting face capture. Move your head slightly between samples. Press 'q' to stop.")
 
-    while True:
+    while frames < MAX_FRAMES:
         ret, frame = cap.read()
+        if not ret:
+            if cap.finished:
+                break
+            continue
+        frames += 1
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
 
         faces = face_cascade.detectMultiScale(gray, 1.3, 5)
 
-        for (x, y, w, h) in faces:
+        face_img = gate.check(gray, faces)
+        if face_img is not None:
             count += 1
-            face_img = gray[y:y+h, x:x+w]
             cv2.imwrite(f"{save_path}/{count}.jpg", face_img)
+            crops.append(face_img)
 
-            cv2.rectangle(frame, (x, y), (x+w, y+h), (255, 0, 0), 2)
+        color = (0, 255, 0) if face_img is not None else (0, 0, 255)
+        for (x, y, w, h) in faces:
+            cv2.rectangle(frame, (x, y), (x+w, y+h), color, 2)
+
+        if count >= TARGET_SAMPLES:
+            break
+        if headless:
+            continue
 
         cv2.imshow("Face Capture", frame)
 
-        if cv2.waitKey(1) & 0xFF == ord('q') or count >= 30:
+        if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
     cap.release()
-    cv2.destroyAllWindows()
-    print("Face capture complete!")
+    if not headless:
+        cv2.destroyAllWindows()
+
+    if crops:
+        append_faces(faculty_id, crops)
+    print(f"Face capture complete! Kept {count} samples from {frames} frames "
+          f"(rejected: {gate.report()})")
 
 if __name__ == "__main__":
     faculty_id = input("Enter Faculty ID: ")
@@ -0,0 +1,123 @@
+import os
+import threading
+import cv2
+import numpy as np
+
+from face_store import load_faces, load_training_set
+from model_registry import get_face_embedder
+from voice_index import normalize
+from atomic_file import atomic_write
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+EMBEDDINGS_FILE = "face_embeddings.npz"   # labels + one unit-norm centroid per identity
+INPUT_SIZE = (112, 112)                   # SFace input
+MATCH_THRESHOLD = 0.637                   # cosine distance (SFace's 0.363 similarity cut-off)
+
+# --------------------------------------------------
+# EMBEDDINGS (OpenCV DNN, no extra dependency)
+# --------------------------------------------------
+_embed_lock = threading.Lock()   # one DNN net shared by every door thread
+
+def embed_face(face_img):
+    # Normalized grayscale crop -> 128-d embedding
+    bgr = cv2.cvtColor(cv2.resize(face_img, INPUT_SIZE), cv2.COLOR_GRAY2BGR)
+    model = get_face_embedder()
+    with _embed_lock:
+        return model.feature(bgr).ravel().astype(np.float32)
+
+def embed_faces(face_imgs):
+    return np.array([embed_face(img) for img in face_imgs], dtype=np.float32)
+
+# --------------------------------------------------
+# RECOGNIZER (same predict() contract as cv2 LBPH)
+# --------------------------------------------------
+class EmbeddingRecognizer:
+
+    def __init__(self, labels=(), centroids=None, threshold=MATCH_THRESHOLD):
+        self.labels = np.asarray(labels, dtype=np.int32)
+        self.centroids = np.zeros((0, 0), np.float32) if centroids is None else normalize(centroids)
+        self.match_threshold = threshold   # FacePipeline accepts distances below this
+
+    def __len__(self):
+        return len(self.labels)
+
+    def match(self, embedding):
+        # One matrix-vector product against every identity centroid
+        scores = self.centroids @ normalize(embedding)
+        best = int(np.argmax(scores))
+        return int(self.labels[best]), float(1.0 - scores[best])
+
+    def predict(self, face_img):
+        if not len(self.labels):
+            raise cv2.error("No identities enrolled")
+        return self.match(embed_face(face_img))
+
+    def add(self, label, embeddings):
+        self.remove(label)
+        centroid = normalize(np.mean(embeddings, axis=0)).reshape(1, -1)
+        self.labels = np.append(self.labels, np.int32(label))
+        self.centroids = centroid if not self.centroids.size else np.vstack([self.centroids, centroid])
+
+    def remove(self, label):
+        keep = self.labels != int(label)
+        if keep.all():
+            return False
+        self.labels = self.labels[keep]
+        self.centroids = self.centroids[keep]
+        return True
+
+    def save(self, path=EMBEDDINGS_FILE):
+        if not len(self.labels):
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        with atomic_write(path, "wb") as f:
+            np.savez(f, labels=self.labels, centroids=self.centroids)
+
+def embeddings_stat(path=EMBEDDINGS_FILE):
+    # Cache key for face_verify.load_recognizer, like lbph_model.model_stat
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+def load_embedding_recognizer(path=EMBEDDINGS_FILE):
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return EmbeddingRecognizer(data["labels"], data["centroids"])
+
+# --------------------------------------------------
+# TRAINING HOOKS (called by face_train when FACE_BACKEND = "embedding")
+# --------------------------------------------------
+def train_embeddings():
+    faces, labels = load_training_set()
+    embeddings = embed_faces(faces)
+    labels = np.asarray(labels)
+
+    recognizer = EmbeddingRecognizer()
+    for label in np.unique(labels):
+        recognizer.add(label, embeddings[labels == label])
+    recognizer.save()
+    print(f"Training complete! {len(recognizer)} identities saved to {EMBEDDINGS_FILE}")
+
+def add_embedding_identity(faculty_id):
+    images = load_faces(faculty_id)
+    if not images:
+        print(f"⚠️ No face samples found for Faculty ID {faculty_id}")
+        return
+
+    recognizer = load_embedding_recognizer() or EmbeddingRecognizer()
+    recognizer.add(int(faculty_id), embed_faces(images))
+    recognizer.save()
+    print(f"Model updated with {len(images)} samples for Faculty ID {faculty_id}")
+
+def remove_embedding_identity(faculty_id, quiet=False):
+    recognizer = load_embedding_recognizer()
+    if recognizer is None or not recognizer.remove(int(faculty_id)):
+        return
+    recognizer.save()
+    if not quiet:
+        print(f"Model updated: removed Faculty ID {faculty_id}")
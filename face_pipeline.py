@@ -0,0 +1,218 @@
+import cv2
+import time
+import queue
+import threading
+import numpy as np
+
+from face_store import normalize_crop
+from liveness import BlinkLiveness
+import metrics
+
+# =============================
+# PIPELINE CONFIG
+# =============================
+DETECT_EVERY = 5            # full-frame Haar detection every N frames
+TRACK_MARGIN = 0.4          # ROI growth around the last face when tracking
+CONFIDENCE_THRESHOLD = 60   # LBPH distance below which a match is accepted
+                            # (other backends carry their own `match_threshold`)
+QUEUE_SIZE = 1              # stages only ever see the freshest frame
+
+def put_latest(q, item):
+    # Bounded hand-off that drops the stale item instead of blocking
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+# =============================
+# FACE TRACKING
+# =============================
+def detect_faces(cascade, gray):
+    return [tuple(f) for f in cascade.detectMultiScale(gray, 1.3, 5)]
+
+def track_face(cascade, gray, box):
+    # Re-detect only inside a margin around the last known face
+    x, y, w, h = box
+    mx, my = int(w * TRACK_MARGIN), int(h * TRACK_MARGIN)
+    x0, y0 = max(0, x - mx), max(0, y - my)
+    x1, y1 = min(gray.shape[1], x + w + mx), min(gray.shape[0], y + h + my)
+
+    found = cascade.detectMultiScale(
+        gray[y0:y1, x0:x1], 1.3, 5, minSize=(w // 2, h // 2)
+    )
+    return [(fx + x0, fy + y0, fw, fh) for (fx, fy, fw, fh) in found]
+
+# =============================
+# STAGED VERIFICATION PIPELINE
+# capture -> detect/landmarks -> recognize, joined by drop-stale queues
+# =============================
+class FacePipeline:
+
+    def __init__(self, cap, recognizer, cascade, mesh, detect_every=DETECT_EVERY, label=None):
+        self.cap = cap
+        self.recognizer = recognizer
+        self.cascade = cascade
+        self.mesh = mesh
+        self.detect_every = detect_every
+        self.prefix = f"[{label}] " if label else ""
+
+        self.frames = queue.Queue(maxsize=QUEUE_SIZE)
+        self.crops = queue.Queue(maxsize=QUEUE_SIZE)
+        self.views = queue.Queue(maxsize=QUEUE_SIZE)
+        self.stop_event = threading.Event()
+        self.capture_done = threading.Event()
+        self.detect_done = threading.Event()
+        self.threads = []
+
+        self.liveness = BlinkLiveness(mesh, label=self.prefix)
+        self.result = None
+        self.started_at = None
+        self.granted_at = None
+        self.stage_times = {"capture": [], "detect": [], "landmarks": [], "recognize": []}
+        self.frames_processed = 0
+
+    # ---------- lifecycle ----------
+    def start(self):
+        self.started_at = time.perf_counter()
+        for target in (self._capture_loop, self._detect_loop, self._recognize_loop):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        # Waits for every stage: the caller may hand cap/mesh to the next
+        # pipeline, and two pipelines must never read them at once
+        self.stop_event.set()
+        for thread in self.threads:
+            thread.join()
+
+    @property
+    def done(self):
+        return self.stop_event.is_set()
+
+    @property
+    def blink_count(self):
+        return self.liveness.blink_count
+
+    @property
+    def first_blink_at(self):
+        return self.liveness.first_blink_at
+
+    def summary(self):
+        elapsed = (self.granted_at or time.perf_counter()) - self.started_at
+        report = {
+            "frames": self.frames_processed,
+            "fps": self.frames_processed / elapsed if elapsed > 0 else 0.0,
+            "time_to_first_blink": None,
+            "time_to_grant": None,
+            "result": self.result
+        }
+        if self.first_blink_at is not None:
+            report["time_to_first_blink"] = self.first_blink_at - self.started_at
+        if self.granted_at is not None:
+            report["time_to_grant"] = self.granted_at - self.started_at
+
+        for stage, times in self.stage_times.items():
+            ms = np.array(times) * 1000
+            report[f"{stage}_ms_mean"] = float(ms.mean()) if len(ms) else None
+            report[f"{stage}_ms_p95"] = float(np.percentile(ms, 95)) if len(ms) else None
+        return report
+
+    def latest_view(self, timeout=0.05):
+        try:
+            return self.views.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _timed(self, stage, start):
+        seconds = time.perf_counter() - start
+        self.stage_times[stage].append(seconds)
+        metrics.observe(f"face.{stage}", seconds)
+
+    # ---------- stage 1: capture ----------
+    def _capture_loop(self):
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            ret, frame = self.cap.read()
+            if not ret:
+                if getattr(self.cap, "finished", False):
+                    break   # recorded source exhausted
+                time.sleep(0.005)
+                continue
+            self._timed("capture", start)
+            put_latest(self.frames, (frame, start))
+
+        self.capture_done.set()
+
+    # ---------- stage 2: detection + landmarks ----------
+    def _update_blinks(self, frame, captured_at, faces):
+        # FaceMesh sees only a downscaled crop around the tracked face;
+        # blink timing uses the capture time, so dropped frames are accounted for
+        start = time.perf_counter()
+        ear = self.liveness.measure(frame, faces[0] if faces else None)
+        self._timed("landmarks", start)
+        self.liveness.update(ear, captured_at)
+
+    def _detect_loop(self):
+        frame_no = 0
+        faces = []
+
+        while not self.stop_event.is_set():
+            try:
+                frame, captured_at = self.frames.get(timeout=0.1)
+            except queue.Empty:
+                if self.capture_done.is_set():
+                    break
+                continue
+
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+            start = time.perf_counter()
+            if faces and frame_no % self.detect_every:
+                faces = track_face(self.cascade, gray, faces[0])
+            else:
+                faces = detect_faces(self.cascade, gray)
+            self._timed("detect", start)
+            frame_no += 1
+            self.frames_processed += 1
+
+            self._update_blinks(frame, captured_at, faces)
+
+            put_latest(self.views, (frame, faces, self.blink_count))
+            live = self.liveness.passed
+            if faces and live and self.recognizer is not None:
+                put_latest(self.crops, (gray, faces))
+
+        self.detect_done.set()
+
+    # ---------- stage 3: recognition ----------
+    def _recognize_loop(self):
+        threshold = getattr(self.recognizer, "match_threshold", CONFIDENCE_THRESHOLD)
+        while not self.stop_event.is_set():
+            try:
+                gray, faces = self.crops.get(timeout=0.1)
+            except queue.Empty:
+                if self.detect_done.is_set():
+                    self.stop_event.set()   # nothing left to recognize
+                continue
+
+            for (x, y, w, h) in faces:
+                face_img = normalize_crop(gray[y:y+h, x:x+w])
+                start = time.perf_counter()
+                try:
+                    id_, confidence = self.recognizer.predict(face_img)
+                except cv2.error:
+                    continue
+                finally:
+                    self._timed("recognize", start)
+
+                if confidence < threshold:
+                    self.result = str(id_)
+                    self.granted_at = time.perf_counter()
+                    self.stop_event.set()
+                    return
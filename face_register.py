@@ -1,7 +1,8 @@
 import cv2
 import os
 import mediapipe as mp
-import json
+
+import faculty_db
 
 def register_face(faculty_id):
     folder = f"faces/{faculty_id}"
@@ -36,21 +37,14 @@ def register_face(faculty_id):
     cv2.destroyAllWindows()
 
     # ✅ DATABASE.JSON CREATION (RIGHT PLACE)
-    db_file = "database.json"
-
-    if os.path.exists(db_file):
-        with open(db_file, "r") as f:
-            db = json.load(f)
-    else:
-        db = {}
+    db = faculty_db.load_db()
 
     db[str(faculty_id)] = {
         "face_path": f"faces/{faculty_id}",
         "voice_path": f"voices/{faculty_id}"
     }
 
-    with open(db_file, "w") as f:
-        json.dump(db, f, indent=4)
+    faculty_db.save_db(db)
 
     print("Faculty registered and database updated.")
     return folder
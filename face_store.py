@@ -0,0 +1,172 @@
+import os
+import json
+import cv2
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from atomic_file import atomic_write
+
+FACE_DIR = "faces"
+PACK_FILE = "face_pack.bin"      # (rows x H x W) uint8 normalized crops
+PACK_INDEX = "face_pack.json"    # faculty_id -> {"offset", "count"}
+FACE_SIZE = (100, 100)           # (width, height) every crop is resized to
+LOAD_WORKERS = 8
+
+# ---------------- NORMALIZATION ----------------
+def normalize_crop(gray):
+    return cv2.resize(gray, FACE_SIZE, interpolation=cv2.INTER_AREA)
+
+# ---------------- PACK INDEX ----------------
+def load_index():
+    if not os.path.exists(PACK_INDEX):
+        return {"size": list(FACE_SIZE), "rows": 0, "identities": {}}
+    with open(PACK_INDEX, "r") as f:
+        return json.load(f)
+
+def save_index(index):
+    with atomic_write(PACK_INDEX) as f:
+        json.dump(index, f, indent=4)
+
+def open_pack(index):
+    if index["rows"] == 0 or not os.path.exists(PACK_FILE):
+        return None
+    width, height = index["size"]
+    return np.memmap(PACK_FILE, dtype=np.uint8, mode="r",
+                     shape=(index["rows"], height, width))
+
+def drop_missing_pack(index):
+    # The index lists identities but face_pack.bin is gone: their crops are
+    # lost, so forget them (legacy JPG folders are still read as before)
+    if index["rows"] == 0 or os.path.exists(PACK_FILE):
+        return False
+    print(f"⚠️ {PACK_FILE} is missing; dropping {len(index['identities'])} packed identities")
+    index.update(rows=0, identities={})
+    save_index(index)
+    return True
+
+def resize_pack():
+    # Crops packed at an older FACE_SIZE are rewritten at the current one,
+    # so training and probes always see the same crop size
+    index = load_index()
+    drop_missing_pack(index)
+    if tuple(index["size"]) == FACE_SIZE:
+        return False
+
+    pack = open_pack(index)
+    if pack is not None:
+        with atomic_write(PACK_FILE, "wb") as f:
+            for crop in pack:
+                f.write(normalize_crop(np.array(crop)).tobytes())
+            del pack   # release the mapping before replacing the file (Windows)
+
+    print(f"🛠️ Resized packed face crops to {FACE_SIZE[0]}x{FACE_SIZE[1]}")
+    index["size"] = list(FACE_SIZE)
+    save_index(index)
+    return True
+
+# ---------------- WRITE ----------------
+def append_faces(faculty_id, crops):
+    faculty_id = str(faculty_id)
+    resize_pack()
+    if faculty_id in load_index()["identities"]:
+        remove_faces(faculty_id)
+
+    index = load_index()
+    data = np.stack([normalize_crop(c) for c in crops]).astype(np.uint8)
+
+    # Overwrite from the indexed end so a half-written append is discarded
+    with open(PACK_FILE, "r+b" if os.path.exists(PACK_FILE) else "wb") as f:
+        f.seek(index["rows"] * data[0].size)
+        f.truncate()
+        f.write(data.tobytes())
+
+    index["identities"][faculty_id] = {"offset": index["rows"], "count": len(data)}
+    index["rows"] += len(data)
+    save_index(index)
+
+def remove_faces(faculty_id):
+    faculty_id = str(faculty_id)
+    index = load_index()
+    if drop_missing_pack(index):
+        return True
+    entry = index["identities"].pop(faculty_id, None)
+    if entry is None:
+        return False
+
+    # Compact: copy every other identity into a fresh pack, in order
+    pack = open_pack(index)
+    rows = 0
+    with atomic_write(PACK_FILE, "wb") as f:
+        for info in sorted(index["identities"].values(), key=lambda e: e["offset"]):
+            start = info["offset"]
+            f.write(pack[start:start + info["count"]].tobytes())
+            info["offset"] = rows
+            rows += info["count"]
+        del pack   # release the mapping before replacing the file (Windows)
+    index["rows"] = rows
+    save_index(index)
+    return True
+
+# ---------------- READ ----------------
+def read_jpg_dir(folder, workers=LOAD_WORKERS):
+    # cv2.imread releases the GIL, so decoding overlaps across threads
+    paths = [f"{folder}/{img}" for img in sorted(os.listdir(folder))]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        images = pool.map(lambda p: cv2.imread(p, 0), paths)
+        return [normalize_crop(img) for img in images if img is not None]
+
+def load_faces(faculty_id):
+    faculty_id = str(faculty_id)
+    resize_pack()
+    index = load_index()
+    entry = index["identities"].get(faculty_id)
+
+    if entry is not None:
+        pack = open_pack(index)
+        return list(np.array(pack[entry["offset"]:entry["offset"] + entry["count"]]))
+
+    folder = f"{FACE_DIR}/{faculty_id}"
+    return read_jpg_dir(folder) if os.path.isdir(folder) else []
+
+def load_training_set():
+    resize_pack()
+    index = load_index()
+    faces = []
+    labels = []
+
+    # Packed identities: one sequential read of the whole pack
+    pack = open_pack(index)
+    if pack is not None:
+        data = np.array(pack)
+        for faculty_id, entry in index["identities"].items():
+            start = entry["offset"]
+            faces.extend(data[start:start + entry["count"]])
+            labels.extend([int(faculty_id)] * entry["count"])
+
+    # Legacy JPG directories not yet packed
+    if os.path.isdir(FACE_DIR):
+        for faculty_id in os.listdir(FACE_DIR):
+            folder = f"{FACE_DIR}/{faculty_id}"
+            if faculty_id in index["identities"] or not os.path.isdir(folder):
+                continue
+            images = read_jpg_dir(folder)
+            faces.extend(images)
+            labels.extend([int(faculty_id)] * len(images))
+
+    return faces, labels
+
+def pack_legacy_dirs():
+    index = load_index()
+    packed = 0
+    for faculty_id in sorted(os.listdir(FACE_DIR)):
+        folder = f"{FACE_DIR}/{faculty_id}"
+        if faculty_id in index["identities"] or not os.path.isdir(folder):
+            continue
+        images = read_jpg_dir(folder)
+        if images:
+            append_faces(faculty_id, images)
+            packed += 1
+    return packed
+
+if __name__ == "__main__":
+    print(f"✅ Packed {pack_legacy_dirs()} legacy face folders into {PACK_FILE}")
@@ -1,28 +1,205 @@
 import cv2
 import os
+import json
 import numpy as np
 
-def train():
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    faces = []
+from face_store import load_faces, load_training_set, FACE_SIZE
+from lbph_model import (
+    compute_histograms, save_model, delete_model, load_model, model_exists,
+    MODEL_POINTER
+)
+
+FACE_DIR = "faces"
+LEGACY_MODEL = "face_model.yml"  # pre-binary YAML model, migrated on first use
+FACE_BACKEND = "lbph"           # "lbph" or "embedding" (face_embeddings.py, OpenCV DNN)
+HIST_CACHE_DIR = "face_cache"   # per-identity LBPH histograms (<faculty_id>.npz)
+MODEL_SIZE_FILE = "face_model_size.json"   # crop size the model was trained at
+
+# ---------------- CROP SIZE ----------------
+# LBP histograms depend on the crop size. Probes are resized to FACE_SIZE, so a
+# model trained on other crops (pre-normalization face_model.yml, or an older
+# FACE_SIZE) would mis-match silently: it is retrained instead.
+def record_face_size():
+    with open(MODEL_SIZE_FILE, "w") as f:
+        json.dump(list(FACE_SIZE), f)
+
+def trained_face_size():
+    if not os.path.exists(MODEL_SIZE_FILE):
+        return None
+    with open(MODEL_SIZE_FILE, "r") as f:
+        return tuple(json.load(f))
+
+def check_face_size():
+    if not model_exists() or trained_face_size() == FACE_SIZE:
+        return False
+    print(f"🛠️ Face model was not trained on {FACE_SIZE[0]}x{FACE_SIZE[1]} crops; retraining...")
+    if not train():
+        record_face_size()   # nothing to retrain from: keep the model, stop asking
+    return True
+
+def prepare_model():
+    # Run once at start-up (main, service, doors, admin), never per verification:
+    # either step may retrain the whole model
+    if FACE_BACKEND == "lbph":
+        migrate_legacy_model()
+        check_face_size()
+
+# ---------------- HISTOGRAM CACHE ----------------
+def load_face_images(faculty_id):
+    return load_faces(faculty_id)
+
+def cache_path(faculty_id):
+    return f"{HIST_CACHE_DIR}/{faculty_id}.npz"
+
+def save_histograms(faculty_id, histograms):
+    os.makedirs(HIST_CACHE_DIR, exist_ok=True)
+    np.savez_compressed(cache_path(faculty_id), histograms=np.vstack(histograms))
+
+def load_histograms(faculty_id):
+    with np.load(cache_path(faculty_id)) as data:
+        return data["histograms"]
+
+def cached_ids():
+    if not os.path.isdir(HIST_CACHE_DIR):
+        return []
+    return [f[:-4] for f in os.listdir(HIST_CACHE_DIR) if f.endswith(".npz")]
+
+def cache_from_arrays(histograms, labels):
+    # Split a model's histograms back into per-identity cache files
+    for label in np.unique(labels):
+        save_histograms(label, [histograms[labels == label]])
+
+def seed_cache():
+    # Models trained before the cache existed seed it once
+    if cached_ids():
+        return
+    if model_exists():
+        model = load_model()
+        cache_from_arrays(np.asarray(model.histograms), model.labels)
+    elif os.path.exists(LEGACY_MODEL):
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.read(LEGACY_MODEL)
+        cache_from_arrays(np.vstack(recognizer.getHistograms()), recognizer.getLabels().ravel())
+
+def migrate_legacy_model():
+    # One-off: face_model.yml -> binary model. Its crops were not resized, so
+    # it is retrained from the enrolled faces; the histograms are converted
+    # as-is only when no face images are left to train from.
+    if model_exists() or not os.path.exists(LEGACY_MODEL):
+        return False
+    faces, _ = load_training_set()
+    if faces:
+        train()
+    else:
+        seed_cache()
+        write_model_from_cache()
+        print(f"⚠️ No face images to retrain from: converted {LEGACY_MODEL} as-is")
+    print(f"🛠️ Converted {LEGACY_MODEL} to the binary model ({MODEL_POINTER})")
+    return True
+
+def write_model_from_cache():
+    # Rebuild the binary model from cached histograms; no image is decoded
+    histograms = []
     labels = []
-    label = 0
 
-    for faculty_id in os.listdir("faces/"):
-        folder = f"faces/{faculty_id}"
+    for faculty_id in sorted(cached_ids(), key=int):
+        hist = load_histograms(faculty_id)
+        histograms.append(hist)
+        labels.extend([int(faculty_id)] * len(hist))
 
-        for img in os.listdir(folder):
-            img_path = f"{folder}/{img}"
-            gray = cv2.imread(img_path, 0)
+    if not histograms:
+        delete_model()
+        return False
 
-            faces.append(gray)
-            labels.append(int(faculty_id))
+    save_model(np.vstack(histograms).astype(np.float32), np.array(labels, dtype=np.int32))
+    return True
 
-        label += 1
+# ---------------- FULL REBUILD ----------------
+def train():
+    if FACE_BACKEND == "embedding":
+        from face_embeddings import train_embeddings
+        return train_embeddings()
+
+    # Packed crops in one sequential read; legacy JPG folders decoded in parallel
+    faces, labels = load_training_set()
+    if not faces:
+        print("⚠️ No face samples found. Nothing to train.")
+        return False
+
+    histograms = compute_histograms(faces)
+    labels = np.array(labels, dtype=np.int32)
+    save_model(histograms, labels)
+    record_face_size()
+
+    # Refresh the per-identity cache so later add/remove stay incremental
+    for faculty_id in cached_ids():
+        os.remove(cache_path(faculty_id))
+    cache_from_arrays(histograms, labels)
+
+    print(f"Training complete! Model saved (current version in {MODEL_POINTER})")
+    return True
+
+# ---------------- INCREMENTAL UPDATES ----------------
+def add_identity(faculty_id):
+    if FACE_BACKEND == "embedding":
+        from face_embeddings import add_embedding_identity
+        return add_embedding_identity(faculty_id)
+
+    faculty_id = str(faculty_id)
+    images = load_face_images(faculty_id)
+    if not images:
+        print(f"⚠️ No face samples found for Faculty ID {faculty_id}")
+        return
+
+    if check_face_size():
+        return   # the retrain already included this identity's samples
+    seed_cache()
+    if faculty_id in cached_ids():
+        # Re-enrollment: drop the old samples before appending the new ones
+        remove_identity(faculty_id, quiet=True)
 
-    recognizer.train(faces, np.array(labels))
-    recognizer.write("face_model.yml")
-    print("Training complete! Model saved as face_model.yml")
+    # LBP histograms depend only on their own image: append, never retrain
+    histograms = compute_histograms(images)
+    labels = np.full(len(images), int(faculty_id), dtype=np.int32)
+
+    model = load_model()
+    if model is not None:
+        histograms = np.vstack([np.asarray(model.histograms), histograms])
+        labels = np.concatenate([model.labels, labels])
+        del model   # drop the mapping so this version can be cleaned up later
+    else:
+        record_face_size()   # first identity starts a fresh model
+
+    save_model(histograms, labels)
+    save_histograms(faculty_id, [histograms[-len(images):]])
+    print(f"Model updated with {len(images)} samples for Faculty ID {faculty_id}")
+
+def remove_identity(faculty_id, quiet=False):
+    if FACE_BACKEND == "embedding":
+        from face_embeddings import remove_embedding_identity
+        return remove_embedding_identity(faculty_id, quiet)
+
+    faculty_id = str(faculty_id)
+
+    if check_face_size():
+        return   # retrained from the remaining samples
+    seed_cache()
+    if faculty_id not in cached_ids():
+        return
+    os.remove(cache_path(faculty_id))
+
+    if write_model_from_cache():
+        if not quiet:
+            print(f"Model updated: removed Faculty ID {faculty_id}")
+    elif not quiet:
+        print("⚠️ No faces left. Face model removed.")
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    import sys
+
+    if len(sys.argv) == 3 and sys.argv[1] == "--add":
+        add_identity(sys.argv[2])
+    elif len(sys.argv) == 3 and sys.argv[1] == "--remove":
+        remove_identity(sys.argv[2])
+    else:
+        train()
@@ -1,124 +1,196 @@
 import cv2
-import json
-import os
-import numpy as np
-import mediapipe as mp
 import time
+import threading
+
+from face_pipeline import FacePipeline
+from liveness import REQUIRED_BLINKS
+from frame_sources import open_source
+import face_train
+from face_embeddings import load_embedding_recognizer, embeddings_stat
+from lbph_model import load_model, model_stat
+import faculty_db
+import metrics
 
 # =============================
-# LIVENESS CONFIG
+# MODEL / DETECTOR SETUP
 # =============================
-EAR_THRESHOLD = 0.18        # eye closed threshold
-BLINK_FRAMES = 2            # frames eyes must stay closed
-REQUIRED_BLINKS = 2         # number of blinks required
+_recognizer_cache = {"stat": None, "recognizer": None}
+_recognizer_lock = threading.Lock()   # door threads load at every session start
+
+def load_recognizer():
+    # Only the cached stat check here: legacy conversion and crop-size
+    # retrains happen in face_train.prepare_model() at start-up
+    with _recognizer_lock:
+        if face_train.FACE_BACKEND == "embedding":
+            stat, loader = embeddings_stat(), load_embedding_recognizer
+        else:
+            stat, loader = model_stat(), load_model
+        if stat is None:
+            return None
+
+        # Loaded once and reused (LBPH: memory-mapped); re-read only after a retrain
+        stat = (face_train.FACE_BACKEND,) + stat
+        if _recognizer_cache["stat"] != stat:
+            _recognizer_cache.update(stat=stat, recognizer=loader())
+        return _recognizer_cache["recognizer"]
+
+def create_detectors():
+    # --- Face detector ---
+    face_cascade = cv2.CascadeClassifier(
+        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+    )
+
+    # --- MediaPipe Face Mesh (imported on first use: slow to load) ---
+    import mediapipe as mp
 
-LEFT_EYE = [33, 160, 158, 133, 153, 144]
-RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+    # Eye-aspect-ratio landmarks are in the base mesh: iris refinement is not needed
+    mp_face = mp.solutions.face_mesh
+    mesh = mp_face.FaceMesh(max_num_faces=1, refine_landmarks=False)
+
+    return face_cascade, mesh
 
-def eye_aspect_ratio(eye):
-    A = np.linalg.norm(eye[1] - eye[5])
-    B = np.linalg.norm(eye[2] - eye[4])
-    C = np.linalg.norm(eye[0] - eye[3])
-    return (A + B) / (2.0 * C)
+# =============================
+# VERIFICATION LOOP
+# =============================
+def draw_view(view):
+    frame, faces, blink_count = view
+
+    for (x, y, w, h) in faces:
+        cv2.rectangle(frame, (x,y), (x+w,y+h), (0,255,0), 2)
+        cv2.putText(
+            frame,
+            f"Blinks: {blink_count}/{REQUIRED_BLINKS}",
+            (x, y-10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.7,
+            (0,255,0),
+            2
+        )
+    return frame
+
+def run_pipeline(source, recognizer, face_cascade, mesh, headless=False, timeout=None):
+    # Capture, detection/landmarks and recognition run on their own threads;
+    # this thread only draws the freshest annotated frame (unless headless)
+    pipeline = FacePipeline(source, recognizer, face_cascade, mesh)
+    pipeline.start()
+
+    try:
+        while not pipeline.done:
+            if timeout is not None and time.perf_counter() - pipeline.started_at > timeout:
+                break
+
+            view = pipeline.latest_view()
+            if view is None or headless:
+                continue
+
+            cv2.imshow("Face Verification", draw_view(view))
+
+            if cv2.waitKey(1) == 27:  # ESC
+                break
+    finally:
+        # Stage threads never outlive the call, even on an error: the caller
+        # reuses the mesh and releases the source next
+        pipeline.stop()
+        if not headless:
+            cv2.destroyAllWindows()
+    return pipeline
 
 # =============================
 # MAIN VERIFICATION FUNCTION
 # =============================
-def verify_face():
+def verify_face(source=0, headless=False, timeout=None, recognizer=None, detectors=None):
+    # A long-running caller (service.py) passes its resident recognizer and
+    # detectors; the interactive menu loads them per attempt
 
     # --- Load trained model ---
-    if not os.path.exists("face_model.yml"):
+    if recognizer is None:
+        with metrics.span("face.model_load"):
+            recognizer = load_recognizer()
+    if recognizer is None:
         print("❌ Face model not found. Train first.")
         return None
 
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.read("face_model.yml")
-
     # --- Load database ---
-    if not os.path.exists("database.json"):
-        print("❌ database.json not found.")
+    if not faculty_db.exists():
+        print(f"❌ {faculty_db.describe()} not found.")
         return None
 
-    db = json.load(open("database.json", "r"))
+    with metrics.span("db.load"):
+        db = faculty_db.get_db()
 
-    # --- Face detector ---
-    face_cascade = cv2.CascadeClassifier(
-        cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-    )
-
-    # --- MediaPipe Face Mesh ---
-    mp_face = mp.solutions.face_mesh
-    mesh = mp_face.FaceMesh(refine_landmarks=True)
-
-    cap = cv2.VideoCapture(0)
-
-    blink_count = 0
-    eye_closed_frames = 0
+    face_cascade, mesh = detectors or create_detectors()
+    cap = open_source(source)
 
     print("🟦 Face verification started")
     print("👁️ Please BLINK twice to confirm liveness")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            continue
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-        results = mesh.process(rgb)
-
-        if results.multi_face_landmarks:
-            landmarks = results.multi_face_landmarks[0].landmark
-
-            left_eye = np.array([[landmarks[i].x, landmarks[i].y] for i in LEFT_EYE])
-            right_eye = np.array([[landmarks[i].x, landmarks[i].y] for i in RIGHT_EYE])
-
-            ear = (eye_aspect_ratio(left_eye) + eye_aspect_ratio(right_eye)) / 2
-
-            if ear < EAR_THRESHOLD:
-                eye_closed_frames += 1
-            else:
-                if eye_closed_frames >= BLINK_FRAMES:
-                    blink_count += 1
-                    print(f"👁️ Blink detected ({blink_count}/{REQUIRED_BLINKS})")
-                eye_closed_frames = 0
-
-        # Draw face box & attempt recognition ONLY if live
-        for (x, y, w, h) in faces:
-            face_img = gray[y:y+h, x:x+w]
-
-            cv2.rectangle(frame, (x,y), (x+w,y+h), (0,255,0), 2)
-            cv2.putText(
-                frame,
-                f"Blinks: {blink_count}/{REQUIRED_BLINKS}",
-                (x, y-10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (0,255,0),
-                2
-            )
-
-            if blink_count >= REQUIRED_BLINKS:
-                try:
-                    id_, confidence = recognizer.predict(face_img)
-                except:
-                    continue
-
-                if confidence < 60:
-                    faculty_id = str(id_)
-                    print(f"✅ Access Granted: Faculty ID {faculty_id}")
-                    cap.release()
-                    cv2.destroyAllWindows()
-                    return faculty_id
-
-        cv2.imshow("Face Verification", frame)
-
-        if cv2.waitKey(1) == 27:  # ESC
-            break
-
-    cap.release()
-    cv2.destroyAllWindows()
+    try:
+        pipeline = run_pipeline(cap, recognizer, face_cascade, mesh, headless, timeout)
+    finally:
+        cap.release()
+    elapsed = time.perf_counter() - pipeline.started_at
+
+    if pipeline.result is not None:
+        print(f"✅ Access Granted: Faculty ID {pipeline.result}")
+        print(f"⏱️ Time to decision: {pipeline.granted_at - pipeline.started_at:.2f}s")
+        metrics.record_outcome("face", "granted", seconds=pipeline.granted_at - pipeline.started_at)
+        return pipeline.result
+
+    # Blinks seen but no match: recognition failed; otherwise liveness never passed
+    reason = "no_match" if pipeline.blink_count >= REQUIRED_BLINKS else "liveness"
+    metrics.record_outcome("face", "denied", reason, elapsed)
     print("❌ Face verification failed.")
     return None
+
+# =============================
+# SEVERAL DOORS, ONE PROCESS
+# The LBPH recognizer is shared (predict is read-only) and re-fetched at
+# every session start, so a retrain reaches running doors. Each door owns
+# its source, face mesh (it tracks one video stream) and pipeline, so
+# blink counts never leak between doors. OpenCV and MediaPipe release the
+# GIL, so door threads run on separate cores.
+# =============================
+SESSION_TIMEOUT = 30   # seconds before a door's liveness state starts over
+
+def watch_door(name, source, on_result, stop_event, session_timeout=SESSION_TIMEOUT):
+    face_cascade, mesh = create_detectors()
+    cap = open_source(source)
+
+    try:
+        while not stop_event.is_set():
+            # Cached until the model file changes: cheap per session
+            pipeline = FacePipeline(cap, load_recognizer(), face_cascade, mesh, label=name)
+            pipeline.start()
+
+            while not pipeline.done and not stop_event.is_set():
+                if session_timeout and time.perf_counter() - pipeline.started_at > session_timeout:
+                    break
+                stop_event.wait(0.05)
+            pipeline.stop()
+
+            # Someone proved liveness: report the outcome, matched or not
+            if pipeline.result is not None or pipeline.blink_count >= REQUIRED_BLINKS:
+                on_result(name, pipeline.result)
+
+            if getattr(cap, "finished", False):
+                break
+    finally:
+        cap.release()
+
+def verify_doors(doors, on_result, stop_event=None, session_timeout=SESSION_TIMEOUT):
+    # doors: {name: frame source}; on_result(name, faculty_id or None) runs on the door's thread
+    if load_recognizer() is None:
+        print("❌ Face model not found. Train first.")
+        return []
+
+    stop_event = stop_event or threading.Event()
+    threads = []
+    for name, source in doors.items():
+        thread = threading.Thread(
+            target=watch_door,
+            args=(name, source, on_result, stop_event, session_timeout),
+            name=f"door-{name}", daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+    return threads
@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import closing
+
+from atomic_file import atomic_write
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+DB_FILE = "database.json"
+SQLITE_FILE = "database.sqlite3"
+BACKEND = "json"          # "json" or "sqlite"
+RECHECK_SECONDS = 1.0     # how often the cache looks at the file's mtime
+FIELDS = ("name", "department", "face_path", "voice_path")
+
+# --------------------------------------------------
+# BACKENDS
+# --------------------------------------------------
+class JsonBackend:
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def version(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def read_all(self):
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def write_all(self, db):
+        # Write-then-rename so readers never see a half-written file
+        with atomic_write(self.path, fsync=True) as f:
+            json.dump(db, f, indent=4)
+
+class SqliteBackend:
+
+    def __init__(self, path=SQLITE_FILE):
+        self.path = path
+        self.schema_ready = False
+
+    def _connect(self):
+        # Callers wrap this in closing(): `with conn` alone commits but never closes
+        if not os.path.exists(self.path):
+            self.schema_ready = False   # new or deleted file: schema goes in first
+        conn = sqlite3.connect(self.path)
+        if not self.schema_ready:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS faculty ("
+                    " id TEXT PRIMARY KEY, name TEXT, department TEXT,"
+                    " face_path TEXT, voice_path TEXT)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS faculty_name ON faculty(name)")
+                conn.execute("CREATE INDEX IF NOT EXISTS faculty_department ON faculty(department)")
+                conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)")
+            self.schema_ready = True
+        return conn
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def version(self):
+        # Bumped inside every write transaction
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def read_all(self):
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT id, {', '.join(FIELDS)} FROM faculty").fetchall()
+        return {
+            row[0]: {k: v for k, v in zip(FIELDS, row[1:]) if v is not None}
+            for row in rows
+        }
+
+    def write_all(self, db):
+        # One transaction: either the whole roster is replaced or nothing is
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM faculty")
+            conn.executemany(
+                f"INSERT INTO faculty (id, {', '.join(FIELDS)}) VALUES (?, ?, ?, ?, ?)",
+                [(fid, *(info.get(k) for k in FIELDS)) for fid, info in db.items()]
+            )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('version', 1) "
+                "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+            )
+
+def create_backend(kind=BACKEND):
+    return SqliteBackend() if kind == "sqlite" else JsonBackend()
+
+# --------------------------------------------------
+# CACHE + INDEXES
+# One parse per change on disk; lookups are dict hits afterwards.
+# --------------------------------------------------
+_backend = create_backend()
+_lock = threading.Lock()
+_cache = {"db": None, "version": None, "checked_at": 0.0, "by_name": {}, "by_department": {}}
+
+def _index(db):
+    by_name, by_department = {}, {}
+    for fid, info in db.items():
+        by_name.setdefault(info.get("name", "").lower(), []).append(fid)
+        by_department.setdefault(info.get("department", "").lower(), []).append(fid)
+    return by_name, by_department
+
+def _store(db, version):
+    by_name, by_department = _index(db)
+    _cache.update(db=db, version=version, checked_at=time.monotonic(),
+                  by_name=by_name, by_department=by_department)
+
+def use_backend(kind):
+    global _backend
+    with _lock:
+        _backend = create_backend(kind)
+        _cache.update(db=None, version=None, checked_at=0.0)
+
+def exists():
+    # Asks the backend: get_db() caches {} for a missing file
+    return _backend.exists()
+
+def describe():
+    # For user messages: the roster's file under whichever backend is active
+    return f"faculty database ({_backend.path})"
+
+def get_db():
+    # Shared read-only view; use load_db() for a copy you can edit
+    now = time.monotonic()
+    if _cache["db"] is not None and now - _cache["checked_at"] < RECHECK_SECONDS:
+        return _cache["db"]
+
+    with _lock:
+        if not _backend.exists():
+            _store({}, None)
+            return _cache["db"]
+
+        version = _backend.version()
+        if _cache["db"] is None or version != _cache["version"]:
+            _store(_backend.read_all(), version)
+        else:
+            _cache["checked_at"] = now
+        return _cache["db"]
+
+def load_db():
+    return {fid: dict(info) for fid, info in get_db().items()}
+
+def save_db(db):
+    with _lock:
+        _backend.write_all(db)
+        _store({fid: dict(info) for fid, info in db.items()}, _backend.version())
+
+# --------------------------------------------------
+# LOOKUPS
+# --------------------------------------------------
+def get_faculty(faculty_id):
+    return get_db().get(str(faculty_id))
+
+def get_faculty_info(faculty_id):
+    info = get_faculty(faculty_id)
+    if not info:
+        return "UNKNOWN", "UNKNOWN"
+    return info.get("name", "UNKNOWN"), info.get("department", "UNKNOWN")
+
+def find_by_name(name):
+    get_db()
+    return list(_cache["by_name"].get(name.lower(), []))
+
+def find_by_department(department):
+    get_db()
+    return list(_cache["by_department"].get(department.lower(), []))
+
+# --------------------------------------------------
+# MIGRATIONS
+# --------------------------------------------------
+def fix_legacy_entries(db, face_dir="faces", voice_dir="voices"):
+    # ---- AUTO-FIX OLD / BROKEN ENTRIES (name used as key) ----
+    fixed_db = {}
+    new_id = 1
+
+    for key, value in db.items():
+        if key.isdigit():
+            fixed_db[key] = value
+        else:
+            fixed_db[str(new_id)] = {
+                "name": key,
+                "department": value.get("department", "Unknown"),
+                "face_path": value.get("face_path", f"{face_dir}/{new_id}"),
+                "voice_path": value.get("voice_path", f"{voice_dir}/{new_id}")
+            }
+            new_id += 1
+
+    return fixed_db
+
+def import_json_to_sqlite(json_path=DB_FILE, sqlite_path=SQLITE_FILE):
+    db = JsonBackend(json_path).read_all()
+    SqliteBackend(sqlite_path).write_all(db)
+    return len(db)
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "--to-sqlite":
+        print(f"✅ Imported {import_json_to_sqlite()} faculty into {SQLITE_FILE}")
+    else:
+        for fid, info in get_db().items():
+            print(f"ID {fid}: {info.get('name', 'UNKNOWN')} ({info.get('department', 'UNKNOWN')})")
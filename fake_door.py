@@ -0,0 +1,91 @@
+import os
+import tty
+import time
+import select
+import threading
+
+# --------------------------------------------------
+# PSEUDO-TERMINAL STAND-IN FOR door_lock_demo.ino
+# Opens a PTY pair and answers on the master side exactly like the
+# firmware: "UNLOCKING DOOR" on UNLOCK, "DOOR LOCKED" once the (extendable)
+# unlock window has passed. Point DoorController at `fake.port`.
+# POSIX only (uses os.openpty).
+# --------------------------------------------------
+UNLOCK_TIME = 5.0
+
+class FakeDoor:
+
+    def __init__(self, unlock_time=UNLOCK_TIME, ack_delay=0.0, mute=False):
+        self.unlock_time = unlock_time
+        self.ack_delay = ack_delay     # simulate a slow board
+        self.mute = mute               # never acknowledge (timeout tests)
+
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+
+        self.unlocked_until = None
+        self.unlocks = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._send("Arduino ready")
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join(timeout=1)
+        os.close(self.master)
+        os.close(self.slave)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def unlocked(self):
+        return self.unlocked_until is not None
+
+    def _send(self, line):
+        os.write(self.master, (line + "\r\n").encode("ascii"))
+
+    def _handle(self, command):
+        if command != "UNLOCK":
+            return
+        self.unlocks += 1
+        if self.mute:
+            return
+        if self.ack_delay:
+            time.sleep(self.ack_delay)
+        self._send("UNLOCKING DOOR")
+        self.unlocked_until = time.monotonic() + self.unlock_time
+
+    def _run(self):
+        buffer = b""
+        while not self.stop_event.is_set():
+            readable, _, _ = select.select([self.master], [], [], 0.01)
+            if readable:
+                try:
+                    buffer += os.read(self.master, 1024)
+                except OSError:
+                    break
+                while b"\n" in buffer:
+                    raw, buffer = buffer.split(b"\n", 1)
+                    self._handle(raw.decode("ascii", errors="ignore").strip())
+
+            if self.unlocked_until is not None and time.monotonic() >= self.unlocked_until:
+                self.unlocked_until = None
+                self._send("DOOR LOCKED")
+
+if __name__ == "__main__":
+    with FakeDoor() as fake:
+        print(f"🧪 Fake door on {fake.port} (set ARDUINO_PORT to it); Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
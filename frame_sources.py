@@ -0,0 +1,142 @@
+import os
+import time
+import cv2
+import numpy as np
+
+# =============================
+# FRAME SOURCES
+# Every source mimics cv2.VideoCapture: read() -> (ret, frame), release().
+# `finished` turns True once a finite source has no frames left.
+# =============================
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+CAMERA_TIMEOUT = 5.0        # seconds of failed reads before a camera counts as gone
+FAILED_READ_WAIT = 0.01     # back-off after a failed read (no busy loop)
+
+class _PacedSource:
+    # Replays frames no faster than `fps` (None = as fast as possible)
+
+    def __init__(self, fps=None):
+        self.fps = fps
+        self.finished = False
+        self._next_at = None
+
+    def _pace(self):
+        if not self.fps:
+            return
+        now = time.perf_counter()
+        if self._next_at is not None and now < self._next_at:
+            time.sleep(self._next_at - now)
+        self._next_at = max(now, self._next_at or now) + 1.0 / self.fps
+
+class CameraSource:
+    # An unplugged or busy camera fails every read: after CAMERA_TIMEOUT of
+    # failures it reports `finished`, so callers stop instead of spinning
+
+    def __init__(self, index=0, timeout=CAMERA_TIMEOUT):
+        self.cap = cv2.VideoCapture(index)
+        self.timeout = timeout
+        self.finished = False
+        self._failing_since = None
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if ret:
+            self._failing_since = None
+            return ret, frame
+
+        now = time.perf_counter()
+        if self._failing_since is None:
+            self._failing_since = now
+        elif now - self._failing_since > self.timeout:
+            if not self.finished:
+                print(f"❌ Camera delivered no frames for {self.timeout:.0f}s")
+            self.finished = True
+        time.sleep(FAILED_READ_WAIT)
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+class VideoFileSource(_PacedSource):
+
+    def __init__(self, path, fps=None, realtime=True):
+        self.cap = cv2.VideoCapture(path)
+        if fps is None and realtime:
+            fps = self.cap.get(cv2.CAP_PROP_FPS) or 30
+        super().__init__(fps)
+
+    def read(self):
+        self._pace()
+        ret, frame = self.cap.read()
+        if not ret:
+            self.finished = True
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
+
+class ImageDirSource(_PacedSource):
+
+    def __init__(self, folder, fps=30):
+        super().__init__(fps)
+        self.paths = [
+            os.path.join(folder, f) for f in sorted(os.listdir(folder))
+            if f.lower().endswith(IMAGE_EXTENSIONS)
+        ]
+        self.position = 0
+
+    def read(self):
+        self._pace()
+        while self.position < len(self.paths):
+            frame = cv2.imread(self.paths[self.position])
+            self.position += 1
+            if frame is not None:
+                return True, frame
+        self.finished = True
+        return False, None
+
+    def release(self):
+        pass
+
+class SyntheticSource(_PacedSource):
+    # Moving-gradient frames: no faces, but exercises every pipeline stage
+
+    def __init__(self, frames=300, width=640, height=480, fps=30, seed=0):
+        super().__init__(fps)
+        self.frames = frames
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+        ramp = np.linspace(0, 255, width, dtype=np.float32)
+        self.base = np.tile(ramp, (height, 1))
+
+    def read(self):
+        self._pace()
+        if self.frames is not None and self.count >= self.frames:
+            self.finished = True
+            return False, None
+
+        shift = (self.count * 8) % self.base.shape[1]
+        gray = np.roll(self.base, shift, axis=1)
+        gray = gray + self.rng.normal(0, 8, gray.shape)
+        frame = cv2.cvtColor(np.clip(gray, 0, 255).astype(np.uint8), cv2.COLOR_GRAY2BGR)
+        self.count += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+def open_source(spec=0, fps=None):
+    # 0 / "0" -> camera, "synthetic[:N]" -> generator, folder -> images, file -> video
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+
+    spec = str(spec)
+    if spec.startswith("synthetic"):
+        _, _, frames = spec.partition(":")
+        return SyntheticSource(int(frames) if frames else 300, fps=fps or 30)
+    if os.path.isdir(spec):
+        return ImageDirSource(spec, fps=fps or 30)
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, fps=fps)
+
+    raise ValueError(f"Unknown frame source: {spec}")
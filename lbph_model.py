@@ -0,0 +1,144 @@
+import os
+import re
+import cv2
+import json
+import numpy as np
+
+from atomic_file import atomic_write
+
+# --------------------------------------------------
+# COMPACT LBPH MODEL
+# face_model.<n>.npy          (N x D) float32 LBP histograms, one row per sample
+# face_model_labels.<n>.npy   (N,) int32 faculty IDs
+# face_model.json             {"version": n}: which pair is current
+# Both arrays load with mmap_mode="r": opening the model costs no parsing,
+# and pages are read on demand. Matching reproduces cv2 LBPH predict()
+# (nearest histogram under HISTCMP_CHISQR_ALT), vectorized in row blocks
+# over only the bins the probe occupies.
+# A save writes a new numbered pair and then moves the pointer: a mapped
+# file is never replaced (Windows refuses while a verifier holds it open).
+# --------------------------------------------------
+MODEL_POINTER = "face_model.json"
+MODEL_HIST = "face_model.{}.npy"
+MODEL_LABELS = "face_model_labels.{}.npy"
+LEGACY_HIST = "face_model.npy"            # unversioned pair, read until the next save
+LEGACY_LABELS = "face_model_labels.npy"
+KEEP_VERSIONS = 2  # the previous pair stays for readers that just read the pointer
+CHUNK_ROWS = 64    # histograms scored per block (keeps temporaries in cache)
+
+def compute_histograms(images):
+    # OpenCV does not expose the LBP histogram directly: a throwaway LBPH
+    # "trained" on the images returns exactly the histograms it would store
+    extractor = cv2.face.LBPHFaceRecognizer_create()
+    extractor.train(list(images), np.zeros(len(images), dtype=np.int32))
+    return np.vstack(extractor.getHistograms()).astype(np.float32)
+
+def chi_square_alt(histograms, row_sums, probe):
+    # 2 * sum((h - p)^2 / (h + p)) == 2 * (sum(h) + sum(p) - 4 * sum(h*p / (h + p))),
+    # and the last term is zero wherever the probe bin is empty: LBP histograms
+    # are sparse, so only the probe's occupied bins need to be visited
+    cols = np.flatnonzero(probe)
+    p = probe[cols]
+    h = histograms[:, cols]
+    overlap = (h * p / (h + p)).sum(axis=1)
+    return 2.0 * (row_sums + p.sum() - 4.0 * overlap)
+
+class LBPHModel:
+
+    def __init__(self, histograms, labels):
+        self.histograms = histograms
+        self.labels = labels
+        self.row_sums = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def distances(self, probe_hist):
+        if self.row_sums is None:
+            self.row_sums = np.asarray(self.histograms.sum(axis=1, dtype=np.float64))
+
+        out = np.empty(len(self.labels), np.float64)
+        for start in range(0, len(out), CHUNK_ROWS):
+            stop = start + CHUNK_ROWS
+            out[start:stop] = chi_square_alt(
+                self.histograms[start:stop], self.row_sums[start:stop], probe_hist
+            )
+        return np.maximum(out, 0.0)
+
+    def predict(self, face_img):
+        # Same (label, distance) contract as cv2 LBPH predict()
+        distances = self.distances(compute_histograms([face_img])[0])
+        best = int(np.argmin(distances))
+        return int(self.labels[best]), float(distances[best])
+
+# ---------------- FILES ----------------
+def current_version():
+    if not os.path.exists(MODEL_POINTER):
+        return None
+    with open(MODEL_POINTER, "r") as f:
+        return json.load(f)["version"]
+
+def saved_versions():
+    pattern = re.compile(r"face_model(?:_labels)?\.(\d+)\.npy$")
+    return sorted({int(m.group(1)) for m in map(pattern.match, os.listdir(".")) if m})
+
+def model_paths():
+    # (histograms, labels) of the current model, or None
+    version = current_version()
+    if version is not None:
+        return MODEL_HIST.format(version), MODEL_LABELS.format(version)
+    if os.path.exists(LEGACY_HIST) and os.path.exists(LEGACY_LABELS):
+        return LEGACY_HIST, LEGACY_LABELS
+    return None
+
+def model_exists():
+    return model_paths() is not None
+
+def model_stat():
+    # Changes on every save (the pointer's mtime covers a restarted count)
+    paths = model_paths()
+    if paths is None:
+        return None
+    pointer = os.stat(MODEL_POINTER).st_mtime_ns if os.path.exists(MODEL_POINTER) else None
+    return paths + (pointer,)
+
+def _remove_quietly(path):
+    # A verifier may still map an old version; on Windows it is removed on a later save
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def save_model(histograms, labels):
+    version = max(saved_versions() + [current_version() or 0]) + 1
+    for path, array in ((MODEL_HIST.format(version), histograms),
+                        (MODEL_LABELS.format(version), labels)):
+        with open(path, "wb") as f:
+            np.save(f, array)
+
+    # Readers switch only once both arrays are complete
+    with atomic_write(MODEL_POINTER) as f:
+        json.dump({"version": version}, f)
+
+    for old in saved_versions():
+        if old <= version - KEEP_VERSIONS:
+            _remove_quietly(MODEL_HIST.format(old))
+            _remove_quietly(MODEL_LABELS.format(old))
+    _remove_quietly(LEGACY_HIST)
+    _remove_quietly(LEGACY_LABELS)
+
+def delete_model():
+    # Pointer first: from then on no reader picks up the arrays
+    _remove_quietly(MODEL_POINTER)
+    for version in saved_versions():
+        _remove_quietly(MODEL_HIST.format(version))
+        _remove_quietly(MODEL_LABELS.format(version))
+    _remove_quietly(LEGACY_HIST)
+    _remove_quietly(LEGACY_LABELS)
+
+def load_model():
+    paths = model_paths()
+    if paths is None:
+        return None
+    hist_path, labels_path = paths
+    return LBPHModel(np.load(hist_path, mmap_mode="r"), np.load(labels_path))
@@ -0,0 +1,160 @@
+import math
+import cv2
+import numpy as np
+
+# =============================
+# LIVENESS CONFIG
+# =============================
+EAR_THRESHOLD = 0.18        # eye closed threshold
+EAR_HYSTERESIS = 0.02       # eyes count as open again only above threshold + this
+BLINK_FRAMES = 2            # frames eyes must stay closed (at 30 fps and above)
+MIN_CLOSED_SECONDS = 0.05   # shortest closure that counts, whatever the frame rate
+MAX_CLOSED_SECONDS = 0.8    # longer closures are not blinks (eyes shut, photo)
+REQUIRED_BLINKS = 2         # number of blinks required
+
+LEFT_EYE = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+EYE_INDICES = LEFT_EYE + RIGHT_EYE
+
+# =============================
+# ROI CONFIG
+# =============================
+ROI_SIZE = 192              # longest side of the face crop handed to FaceMesh
+ROI_MARGIN = 0.25           # growth around the face box (keeps the brows/eyes in)
+FULL_FRAME_SIZE = 480       # longest side when no face box is known yet
+FPS_SMOOTHING = 0.1         # EMA weight of the newest frame interval
+
+def eyes_aspect_ratio(points):
+    # points: (12, 2) pixel coordinates, LEFT_EYE then RIGHT_EYE -> mean EAR of both eyes
+    eyes = points.reshape(2, 6, 2)
+    vertical = np.linalg.norm(eyes[:, [1, 2]] - eyes[:, [5, 4]], axis=2).sum(axis=1)
+    horizontal = np.linalg.norm(eyes[:, 0] - eyes[:, 3], axis=1)
+    return float(np.mean(vertical / (2.0 * np.maximum(horizontal, 1e-6))))
+
+def crop_roi(frame, box, margin=ROI_MARGIN, size=ROI_SIZE):
+    # Face box grown by `margin`, resized so its longest side is `size`
+    x, y, w, h = box
+    mx, my = int(w * margin), int(h * margin)
+    x0, y0 = max(0, x - mx), max(0, y - my)
+    x1, y1 = min(frame.shape[1], x + w + mx), min(frame.shape[0], y + h + my)
+    roi = frame[y0:y1, x0:x1]
+
+    scale = size / max(roi.shape[:2])
+    if scale < 1:
+        roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return roi
+
+def downscale(frame, size=FULL_FRAME_SIZE):
+    scale = size / max(frame.shape[:2])
+    if scale >= 1:
+        return frame
+    return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+# =============================
+# BLINK LIVENESS ENGINE
+# measure(): FaceMesh on a small face ROI -> EAR of the 12 eye landmarks
+# update():  blink state machine driven by timestamps, not frame counts,
+#            so a blink spanning a single frame at 8 fps still counts
+# =============================
+class BlinkLiveness:
+
+    def __init__(self, mesh, required_blinks=REQUIRED_BLINKS, label=""):
+        self.mesh = mesh
+        self.required_blinks = required_blinks
+        self.prefix = label
+        self.reset()
+
+    def reset(self):
+        self.blink_count = 0
+        self.first_blink_at = None
+        self.last_ear = None
+        self.fps = None
+        self._last_ts = None
+        self._closed_since = None
+        self._closed_until = None
+        self._closed_frames = 0
+
+    @property
+    def passed(self):
+        return self.blink_count >= self.required_blinks
+
+    def min_closed_frames(self):
+        # 2 frames at 30 fps, 1 frame below ~20 fps: a 100 ms blink is one frame at 10 fps
+        if not self.fps:
+            return BLINK_FRAMES
+        return max(1, min(BLINK_FRAMES, math.ceil(MIN_CLOSED_SECONDS * self.fps)))
+
+    # ---------- landmarks ----------
+    def measure(self, frame, box=None):
+        # BGR frame (+ optional face box) -> EAR, or None when no face is found.
+        # No box (face lost): the whole downscaled frame, never an old position
+        roi = crop_roi(frame, box) if box is not None else downscale(frame)
+        rgb = cv2.cvtColor(roi, cv2.COLOR_BGR2RGB)
+        results = self.mesh.process(rgb)
+        if not results.multi_face_landmarks:
+            return None
+
+        landmarks = results.multi_face_landmarks[0].landmark
+        points = np.fromiter(
+            (c for i in EYE_INDICES for c in (landmarks[i].x, landmarks[i].y)),
+            dtype=np.float32, count=2 * len(EYE_INDICES)
+        ).reshape(-1, 2)
+        # Normalized -> pixels, so a non-square ROI does not skew the ratio
+        points *= (roi.shape[1], roi.shape[0])
+        return eyes_aspect_ratio(points)
+
+    # ---------- state machine ----------
+    def update(self, ear, timestamp):
+        # Returns True when this frame completes a blink
+        if self._last_ts is not None and timestamp > self._last_ts:
+            rate = 1.0 / (timestamp - self._last_ts)
+            self.fps = rate if self.fps is None else self.fps + FPS_SMOOTHING * (rate - self.fps)
+        self._last_ts = timestamp
+        self.last_ear = ear
+
+        if ear is None:
+            return False
+
+        if ear < EAR_THRESHOLD:
+            if self._closed_since is None:
+                self._closed_since = timestamp
+            self._closed_until = timestamp
+            self._closed_frames += 1
+            return False
+
+        if self._closed_since is None or ear < EAR_THRESHOLD + EAR_HYSTERESIS:
+            return False   # open, or still in the hysteresis band
+
+        # Lower bound of how long the eyes were shut: first to last closed frame
+        closed_for = self._closed_until - self._closed_since
+        blink = (self._closed_frames >= self.min_closed_frames()
+                 and closed_for <= MAX_CLOSED_SECONDS)
+        self._closed_since = self._closed_until = None
+        self._closed_frames = 0
+
+        if blink:
+            self.blink_count += 1
+            if self.first_blink_at is None:
+                self.first_blink_at = timestamp
+            print(f"{self.prefix}👁️ Blink detected ({self.blink_count}/{self.required_blinks})")
+        return blink
+
+    def process(self, frame, timestamp, box=None):
+        ear = self.measure(frame, box)
+        self.update(ear, timestamp)
+        return ear
+
+    # ---------- offline ----------
+    def process_sequence(self, frames, fps=30.0, boxes=None):
+        # Recorded frames (e.g. a test clip) at a known frame rate -> EAR per frame
+        ears = []
+        for i, frame in enumerate(frames):
+            box = boxes[i] if boxes is not None else None
+            ears.append(self.process(frame, i / fps, box))
+        return ears
+
+    def replay(self, ears, fps=30.0):
+        # EAR series only (no mesh): exercises the state machine alone
+        for i, ear in enumerate(ears):
+            self.update(ear, i / fps)
+        return self.blink_count
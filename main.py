@@ -1,65 +1,22 @@
-import os
-import json
-import serial
 import time
-from datetime import datetime
+STARTUP_T0 = time.perf_counter()
 
+import metrics
+from access_log import log_access
+from door_controller import DoorController, BAUD_RATE
 from face_verify import verify_face
+from face_train import prepare_model
 from voice_verify import verify_voice
-
-LOG_FILE = "access_log.txt"
-DB_FILE = "database.json"
+from model_registry import warm_up, load_times
+from faculty_db import get_faculty_info, get_db
 
 # --------------------------------------------------
 # ARDUINO SERIAL SETUP
 # --------------------------------------------------
-ARDUINO_PORT = "COM4"   # 🔁 CHANGE if needed
-BAUD_RATE = 9600
-
-try:
-    arduino = serial.Serial(ARDUINO_PORT, BAUD_RATE, timeout=1)
-    time.sleep(2)  # allow Arduino reset
-    print("🔌 Arduino connected successfully")
-except Exception as e:
-    arduino = None
-    print(f"⚠️ Arduino not connected: {e}")
-
-# --------------------------------------------------
-# LOAD FACULTY INFO
-# --------------------------------------------------
-def get_faculty_info(faculty_id):
-    if not os.path.exists(DB_FILE):
-        return "UNKNOWN", "UNKNOWN"
-
-    with open(DB_FILE, "r") as f:
-        db = json.load(f)
-
-    info = db.get(str(faculty_id))
-    if not info:
-        return "UNKNOWN", "UNKNOWN"
+ARDUINO_PORT = "COM4"   # 🔁 CHANGE if needed (a fake_door.py PTY path works too)
 
-    return info.get("name", "UNKNOWN"), info.get("department", "UNKNOWN")
-
-# --------------------------------------------------
-# LOGGING
-# --------------------------------------------------
-def log_access(faculty_id, method, status):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    if faculty_id is None:
-        log_entry = (
-            f"{timestamp} | ID: UNKNOWN | Name: UNKNOWN | "
-            f"Dept: UNKNOWN | Method: {method} | {status}\n"
-        )
-    else:
-        name, department = get_faculty_info(faculty_id)
-        log_entry = (
-            f"{timestamp} | ID: {faculty_id} | Name: {name} | "
-            f"Dept: {department} | Method: {method} | {status}\n"
-        )
-
-    with open(LOG_FILE, "a") as log:
-        log.write(log_entry)
+# Connects, reconnects and waits for acknowledgements on its own thread
+controller = None
 
 # --------------------------------------------------
 # ACCESS CONTROL
@@ -74,12 +31,9 @@ def unlock_door(faculty_id, method):
 
     log_access(faculty_id, method, "GRANTED")
 
-    if arduino:
-        try:
-            arduino.write(b"UNLOCK\n")
-            print("🔌 Arduino command sent: UNLOCK")
-        except Exception as e:
-            print(f"⚠️ Arduino write error: {e}")
+    if controller:
+        controller.unlock()   # queued; the controller reports the firmware's ack
+        print("🔌 Arduino command queued: UNLOCK")
 
 def deny_access(method):
     print("\n❌ ACCESS DENIED")
@@ -89,7 +43,23 @@ def deny_access(method):
 # MAIN MENU
 # --------------------------------------------------
 def main():
+    global controller
+    controller = DoorController(ARDUINO_PORT, BAUD_RATE).start()
+    get_db()   # parse the roster once so unlock lookups are cache hits
+    prepare_model()   # one-off face model conversion / retrain, not per attempt
+
+    # Speaker model loads in the background; Vosk waits for the chosen phrase
+    warm_start = time.perf_counter()
+    warm_thread = warm_up(speaker=True)
+
+    print(f"⏱️ Startup: {(time.perf_counter() - STARTUP_T0) * 1000:.0f} ms to menu")
+
     while True:
+        if warm_thread is not None and not warm_thread.is_alive():
+            print(f"⏱️ Models warm after {time.perf_counter() - warm_start:.1f}s "
+                  f"({', '.join(f'{k} {v:.1f}s' for k, v in load_times.items())})")
+            warm_thread = None
+
         print("\n====================================")
         print(" AI SMART CLASSROOM ACCESS SYSTEM ")
         print("====================================")
@@ -107,6 +77,7 @@ def main():
                 unlock_door(result, "FACE")
             else:
                 deny_access("FACE")
+            metrics.export(metrics.PROM_FILE, metrics.JSON_FILE)
 
         elif choice == "2":
             print("\n🟩 Starting Voice Verification...")
@@ -116,9 +87,11 @@ def main():
                 unlock_door(result, "VOICE")
             else:
                 deny_access("VOICE")
+            metrics.export(metrics.PROM_FILE, metrics.JSON_FILE)
 
         elif choice == "3":
             print("\nExiting system...")
+            metrics.export(metrics.PROM_FILE, metrics.JSON_FILE)   # acks that arrived since the last attempt
             break
 
         else:
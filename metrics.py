@@ -0,0 +1,194 @@
+import json
+import time
+import bisect
+import threading
+
+from atomic_file import atomic_write
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+ENABLED = True
+PROM_FILE = "metrics.prom"          # Prometheus text format (node_exporter textfile)
+JSON_FILE = "metrics.json"          # human-readable summary
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# --------------------------------------------------
+# HISTOGRAMS
+# series key: (metric, ((label, value), ...)) -> bucket counts, sum, count
+# --------------------------------------------------
+_lock = threading.Lock()
+_histograms = {}
+_counters = {}
+COUNTER_HELP = {
+    "access_verifications_total": "Verification attempts by outcome and reason.",
+    "door_commands_total": "Door controller events (sent, acked, locked, timeout, expired, reconnects)."
+}
+
+class _Histogram:
+
+    __slots__ = ("buckets", "total", "count")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)   # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket holding the q-th observation
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), self.buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+def _key(metric, labels):
+    return metric, tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+def observe(stage, seconds, **labels):
+    if not ENABLED:
+        return
+    key = _key("access_stage_seconds", dict(labels, stage=stage))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = _Histogram()
+        hist.observe(seconds)
+
+def count(metric, **labels):
+    if not ENABLED:
+        return
+    key = _key(metric, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + 1
+
+def record_outcome(method, outcome, reason=None, seconds=None):
+    # outcome: "granted" / "denied"; reason says which gate denied
+    count("access_verifications_total", method=method, outcome=outcome, reason=reason)
+    if seconds is not None:
+        observe(f"{method}.total", seconds, outcome=outcome)
+
+def record_door_event(door, event, seconds=None):
+    # DoorController: event counts per door, plus the unlock ack latency
+    count("door_commands_total", door=door, event=event)
+    if seconds is not None:
+        observe("door.ack", seconds, door=door)
+
+# --------------------------------------------------
+# SPANS
+#   with metrics.span("voice.vosk_decode"):
+#       ...
+# Disabled: one shared no-op object, no clock reads.
+# --------------------------------------------------
+class _Span:
+
+    __slots__ = ("stage", "labels", "start")
+
+    def __init__(self, stage, labels):
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self.start, **self.labels)
+        return False
+
+class _NoopSpan:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOOP = _NoopSpan()
+
+def span(stage, **labels):
+    return _Span(stage, labels) if ENABLED else _NOOP
+
+def set_enabled(flag):
+    global ENABLED
+    ENABLED = bool(flag)
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+# --------------------------------------------------
+# EXPORT
+# --------------------------------------------------
+def _labels_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+def prometheus_text():
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+
+    lines = [
+        "# HELP access_stage_seconds Time spent per verification stage.",
+        "# TYPE access_stage_seconds histogram"
+    ]
+    for (metric, labels), hist in histograms:
+        cumulative = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), hist.buckets):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{metric}_bucket{_labels_text(labels, [('le', le)])} {cumulative}")
+        lines.append(f"{metric}_sum{_labels_text(labels)} {hist.total}")
+        lines.append(f"{metric}_count{_labels_text(labels)} {hist.count}")
+
+    # Counters are sorted by metric name: one HELP/TYPE header per family
+    current = None
+    for (metric, labels), value in counters:
+        if metric != current:
+            current = metric
+            lines += [f"# HELP {metric} {COUNTER_HELP.get(metric, metric)}", f"# TYPE {metric} counter"]
+        lines.append(f"{metric}{_labels_text(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+def summary():
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+
+    stages = []
+    for (_, labels), hist in histograms:
+        stages.append(dict(
+            labels,
+            count=hist.count,
+            mean_ms=hist.total / hist.count * 1000,
+            p50_ms_le=hist.quantile(0.5) * 1000,
+            p95_ms_le=hist.quantile(0.95) * 1000
+        ))
+    outcomes = [dict(labels, count=value) for (metric, labels), value in counters
+                if metric == "access_verifications_total"]
+    doors = [dict(labels, count=value) for (metric, labels), value in counters
+             if metric == "door_commands_total"]
+    return {"stages": stages, "outcomes": outcomes, "doors": doors}
+
+def _write(path, text):
+    with atomic_write(path) as f:
+        f.write(text)
+
+def export(prom_path, json_path):
+    # Called by the long-running entry points (main.py, service.py, doors.py),
+    # each with its own files; tools and benchmarks never write them
+    if not ENABLED or not (_histograms or _counters):
+        return
+    _write(prom_path, prometheus_text())
+    _write(json_path, json.dumps(summary(), indent=2))
@@ -0,0 +1,97 @@
+import time
+import threading
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+VOSK_PATHS = {
+    "en": "models/vosk-en",
+    "ph": "models/vosk-ph"
+}
+SPEAKER_SOURCE = "speechbrain/spkrec-ecapa-voxceleb"
+SPEAKER_SAVEDIR = "pretrained_models/spkrec-ecapa"
+FACE_EMBEDDER_PATH = "models/face_recognition_sface_2021dec.onnx"   # OpenCV Zoo SFace
+
+# --------------------------------------------------
+# REGISTRY
+# Models load on first use (or from a warm-up thread) and are then shared.
+# One lock per model, so different models can load in parallel while a
+# second caller of the same model waits for the first load to finish.
+# --------------------------------------------------
+_models = {}
+_locks = {}
+_registry_lock = threading.Lock()
+load_times = {}   # model name -> seconds spent loading
+
+def _get(name, loader):
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        lock = _locks.setdefault(name, threading.Lock())
+
+    with lock:
+        if name not in _models:
+            start = time.perf_counter()
+            _models[name] = loader()
+            load_times[name] = time.perf_counter() - start
+        return _models[name]
+
+# --------------------------------------------------
+# LOADERS (heavy imports happen here, not at module import)
+# --------------------------------------------------
+def _load_speaker_model():
+    from speechbrain.pretrained import SpeakerRecognition
+
+    print("Loading speaker verification model...")
+    return SpeakerRecognition.from_hparams(
+        source=SPEAKER_SOURCE,
+        savedir=SPEAKER_SAVEDIR,
+        run_opts={"device": "cpu"}
+    )
+
+def _load_vosk_model(lang):
+    from vosk import Model
+
+    print(f"Loading Vosk model ({lang})...")
+    return Model(VOSK_PATHS[lang])
+
+def _load_face_embedder():
+    import cv2
+
+    print("Loading face embedding model...")
+    return cv2.FaceRecognizerSF.create(FACE_EMBEDDER_PATH, "")
+
+def get_speaker_model():
+    return _get("speaker", _load_speaker_model)
+
+def get_vosk_model(lang):
+    return _get(f"vosk-{lang}", lambda: _load_vosk_model(lang))
+
+def get_face_embedder():
+    return _get("face-embedder", _load_face_embedder)
+
+# --------------------------------------------------
+# WARM-UP
+# --------------------------------------------------
+def _warm(loaders):
+    for loader in loaders:
+        try:
+            loader()
+        except Exception as e:
+            print(f"⚠️ Warm-up failed: {e}")
+
+def warm_up(speaker=True, langs=(), background=True):
+    loaders = []
+    if speaker:
+        loaders.append(get_speaker_model)
+    loaders.extend(lambda lang=lang: get_vosk_model(lang) for lang in langs)
+
+    if not background:
+        _warm(loaders)
+        return None
+
+    thread = threading.Thread(target=_warm, args=(loaders,), daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,193 @@
+import os
+import re
+import json
+import threading
+from contextlib import contextmanager
+
+from model_registry import get_vosk_model
+from atomic_file import atomic_write
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+PHRASES_FILE = "phrases.json"     # optional: a list of phrases, or {"en": [...], "ph": [...]}
+DEFAULT_PHRASES = [
+    "magandang araw sayo kaibigan",
+    "may asong tumatawid ng kalsada",
+    "ang kulit mo",
+    "someone broke a glass bottle",
+    "the dog jumped over the fence",
+    "hello professor"
+]
+UNK = "[unk]"                     # Vosk's garbage word: anything outside the grammar
+GRAMMAR_PHRASE_LIMIT = 100        # above this, the grammar lists words instead of phrases
+SAMPLE_RATE = 16000
+
+# --------------------------------------------------
+# LANGUAGE DETECTION
+# --------------------------------------------------
+def detect_language(text):
+    if re.search(r"[ñáéíóú]", text) or any(w in text for w in ["ang", "may", "sayo"]):
+        return "ph"
+    return "en"
+
+def strip_unk(text):
+    return " ".join(w for w in text.split() if w != UNK)
+
+# --------------------------------------------------
+# PHRASE SET
+# Challenge phrases grouped by language. Adding phrases changes the
+# language's grammar; recognizers built for the old grammar are dropped.
+# --------------------------------------------------
+def normalize_phrase(phrase):
+    return " ".join(phrase.lower().split())
+
+class PhraseSet:
+
+    def __init__(self, phrases=()):
+        self.by_lang = {}
+        self.grammars = {}
+        self.lock = threading.Lock()
+        self.add(phrases)
+
+    def __contains__(self, phrase):
+        phrase = normalize_phrase(phrase)
+        with self.lock:
+            return phrase in self.by_lang.get(detect_language(phrase), [])
+
+    def add(self, phrases):
+        with self.lock:
+            for phrase in phrases:
+                phrase = normalize_phrase(phrase)
+                entries = self.by_lang.setdefault(detect_language(phrase), [])
+                if phrase and phrase not in entries:
+                    entries.append(phrase)
+            self.grammars = {}
+        _pool.clear()
+
+    def phrases(self, lang=None):
+        with self.lock:
+            if lang is not None:
+                return list(self.by_lang.get(lang, []))
+            return [p for entries in self.by_lang.values() for p in entries]
+
+    def grammar(self, lang):
+        # Vosk grammar: the decoder may only output these strings. Whole phrases
+        # give the tightest search; a large generated set is passed as its word
+        # vocabulary instead, which grows far slower than the phrase count.
+        with self.lock:
+            grammar = self.grammars.get(lang)
+            if grammar is None:
+                phrases = list(self.by_lang.get(lang, []))
+                if len(phrases) > GRAMMAR_PHRASE_LIMIT:
+                    phrases = sorted({w for p in phrases for w in p.split()})
+                grammar = self.grammars[lang] = json.dumps(phrases + [UNK], ensure_ascii=False)
+            return grammar
+
+    def save(self, path=PHRASES_FILE):
+        with self.lock:
+            data = json.dumps(self.by_lang, indent=4, ensure_ascii=False)
+        with atomic_write(path) as f:
+            f.write(data)
+
+def load_phrases(path=PHRASES_FILE):
+    if not os.path.exists(path):
+        return PhraseSet(DEFAULT_PHRASES)
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = [p for entries in data.values() for p in entries]
+    return PhraseSet(data)
+
+# --------------------------------------------------
+# RECOGNIZER POOL
+# Grammar recognizers are costly to build (the grammar is compiled into the
+# decoding graph), so they are built once per language and reused:
+# release() calls Reset() and puts the recognizer back.
+# --------------------------------------------------
+def build_recognizer(lang, sample_rate, grammar):
+    from vosk import KaldiRecognizer
+
+    rec = KaldiRecognizer(get_vosk_model(lang), sample_rate, grammar)
+    rec.SetWords(False)
+    return rec
+
+class _RecognizerPool:
+
+    def __init__(self):
+        self.idle = {}   # (lang, sample_rate, grammar) -> [KaldiRecognizer]
+        self.lock = threading.Lock()
+
+    def clear(self):
+        with self.lock:
+            self.idle.clear()
+
+    def acquire(self, lang, sample_rate=SAMPLE_RATE):
+        key = (lang, sample_rate, phrase_set.grammar(lang))
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return key, idle.pop()
+        return key, build_recognizer(lang, sample_rate, key[2])
+
+    def release(self, key, rec):
+        rec.Reset()
+        with self.lock:
+            # Dropped if the phrase set changed while it was in use
+            if key[2] == phrase_set.grammar(key[0]):
+                self.idle.setdefault(key, []).append(rec)
+
+_pool = _RecognizerPool()
+phrase_set = load_phrases()
+
+@contextmanager
+def recognizer(lang, sample_rate=SAMPLE_RATE, phrase=None):
+    # with phrase_recognizer.recognizer("en", phrase=expected) as rec: ...
+    # A challenge from outside the set (e.g. passed to verify_voice) gets a
+    # one-off recognizer for that phrase alone: the shared grammar and the
+    # pooled recognizers are left as they are
+    if phrase is not None and phrase not in phrase_set:
+        grammar = json.dumps([normalize_phrase(phrase), UNK], ensure_ascii=False)
+        yield build_recognizer(lang, sample_rate, grammar)
+        return
+
+    key, rec = _pool.acquire(lang, sample_rate)
+    try:
+        yield rec
+    finally:
+        _pool.release(key, rec)
+
+def prebuild(lang, sample_rate=SAMPLE_RATE):
+    # Loads the Vosk model if needed and leaves one ready recognizer in the pool
+    if phrase_set.phrases(lang):
+        _pool.release(*_pool.acquire(lang, sample_rate))
+
+def prefetch(lang):
+    # Background load + build for the language the chosen phrase needs
+    thread = threading.Thread(target=_prebuild_quietly, args=(lang,), daemon=True)
+    thread.start()
+    return thread
+
+def _prebuild_quietly(lang):
+    try:
+        prebuild(lang)
+    except Exception as e:
+        print(f"⚠️ Warm-up failed: {e}")
+
+def add_phrases(phrases, save=True):
+    phrase_set.add(phrases)
+    if save:
+        phrase_set.save()
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 2 and sys.argv[1] == "--add":
+        add_phrases(sys.argv[2:])
+        print(f"✅ Saved {len(phrase_set.phrases())} phrases to {PHRASES_FILE}")
+    else:
+        for lang, entries in phrase_set.by_lang.items():
+            print(f"[{lang}] {len(entries)} phrases")
+            for phrase in entries:
+                print(f"  {phrase}")
@@ -0,0 +1,305 @@
+import os
+import json
+import time
+import asyncio
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from face_verify import verify_face, load_recognizer, create_detectors
+from face_train import prepare_model
+from voice_verify import verify_voice
+from model_registry import warm_up, VOSK_PATHS
+from phrase_recognizer import prebuild, phrase_set
+from access_log import log_access
+import metrics
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+HOST = "127.0.0.1"
+PORT = 8765
+FACE_WORKERS = 2       # concurrent face sessions (each owns a face mesh)
+VOICE_WORKERS = 1      # concurrent voice sessions
+QUEUE_LIMIT = 8        # waiting requests per kind before answering 503
+FACE_TIMEOUT = 30      # seconds a face session may run (default)
+MAX_FACE_TIMEOUT = 60  # upper bound a request may ask for
+FACE_CAMERA = 0        # camera used when a face request names no source
+FACE_DIR = "face_requests"   # /verify/face only replays videos / image folders from here
+LATENCY_WINDOW = 500   # recent requests kept for percentiles
+WAV_DIR = "voice_requests"   # /verify/voice only replays WAVs from this folder
+METRICS_PROM = "metrics-service.prom"   # stage metrics written on shutdown
+METRICS_JSON = "metrics-service.json"
+
+# --------------------------------------------------
+# SERVICE
+# Requests are queued per kind; a fixed set of workers drains each queue and
+# runs the blocking verify_face / verify_voice on a thread pool, so models
+# stay resident and the event loop only ever shuffles requests.
+# --------------------------------------------------
+class VerificationService:
+
+    def __init__(self, face_workers=FACE_WORKERS, voice_workers=VOICE_WORKERS,
+                 queue_limit=QUEUE_LIMIT):
+        self.workers = {"face": face_workers, "voice": voice_workers}
+        self.queue_limit = queue_limit
+        self.queues = {}
+        self.executor = ThreadPoolExecutor(max_workers=face_workers + voice_workers + 1)
+        self.tasks = []
+
+        self.counts = {kind: Counter() for kind in self.workers}
+        self.latencies = {kind: deque(maxlen=LATENCY_WINDOW) for kind in self.workers}
+        self.waits = {kind: deque(maxlen=LATENCY_WINDOW) for kind in self.workers}
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+
+        # Speaker + every Vosk language (with its grammar recognizer) + the
+        # face model, loaded once up front. Like warm_up, a failed load is only
+        # logged: the service starts anyway and the first request retries it.
+        start = time.perf_counter()
+        await loop.run_in_executor(
+            self.executor, lambda: warm_up(speaker=True, langs=tuple(VOSK_PATHS), background=False)
+        )
+        steps = [lambda lang=lang: prebuild(lang) for lang in VOSK_PATHS]
+        steps += [prepare_model, load_recognizer]
+        for step in steps:
+            try:
+                await loop.run_in_executor(self.executor, step)
+            except Exception as e:
+                print(f"⚠️ Warm-up failed: {e}")
+        print(f"⏱️ Models resident after {time.perf_counter() - start:.1f}s")
+
+        for kind, count in self.workers.items():
+            self.queues[kind] = asyncio.Queue(maxsize=self.queue_limit)
+            for _ in range(count):
+                self.tasks.append(asyncio.create_task(self._worker(kind)))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.executor.shutdown(wait=False)
+        metrics.export(METRICS_PROM, METRICS_JSON)
+
+    # ---------- requests ----------
+    async def submit(self, kind, params):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queues[kind].put_nowait((params, future, time.perf_counter()))
+        except asyncio.QueueFull:
+            self.counts[kind]["rejected"] += 1
+            return 503, {"error": f"{kind} queue full, retry later"}
+        return 200, await future
+
+    def _verify(self, kind, params, detectors):
+        if kind == "face":
+            # Per request: cached until the model file changes, so a retrain
+            # (admin.py, bulk_enroll.py) is picked up without a restart
+            return verify_face(
+                params["source"], headless=True, timeout=params["timeout"],
+                recognizer=load_recognizer(), detectors=detectors
+            )
+        return verify_voice(params.get("wav"), params.get("phrase"))
+
+    async def _worker(self, kind):
+        loop = asyncio.get_running_loop()
+        detectors = None   # the face mesh keeps per-stream state: one per worker
+
+        while True:
+            params, future, queued_at = await self.queues[kind].get()
+            started = time.perf_counter()
+            try:
+                if kind == "face" and detectors is None:
+                    detectors = await loop.run_in_executor(self.executor, create_detectors)
+                faculty_id = await loop.run_in_executor(
+                    self.executor, self._verify, kind, params, detectors
+                )
+                status = "GRANTED" if faculty_id else "DENIED"
+                log_access(faculty_id, kind.upper(), status)
+                payload = {"status": status, "faculty_id": faculty_id}
+            except Exception as e:
+                status = "ERROR"
+                payload = {"status": status, "error": str(e)}
+            finally:
+                self.queues[kind].task_done()
+
+            finished = time.perf_counter()
+            self.counts[kind][status] += 1
+            self.waits[kind].append(started - queued_at)
+            self.latencies[kind].append(finished - started)
+
+            payload["queue_ms"] = round((started - queued_at) * 1000, 1)
+            payload["latency_ms"] = round((finished - started) * 1000, 1)
+            if not future.done():
+                future.set_result(payload)
+
+    # ---------- metrics ----------
+    def metrics(self):
+        report = {}
+        for kind in self.workers:
+            ms = np.array(self.latencies[kind]) * 1000
+            waits = np.array(self.waits[kind]) * 1000
+            report[kind] = {
+                "counts": dict(self.counts[kind]),
+                "queued": self.queues[kind].qsize() if kind in self.queues else 0,
+                "latency_ms_p50": float(np.percentile(ms, 50)) if len(ms) else None,
+                "latency_ms_p95": float(np.percentile(ms, 95)) if len(ms) else None,
+                "queue_ms_p95": float(np.percentile(waits, 95)) if len(waits) else None
+            }
+        return report
+
+# --------------------------------------------------
+# HTTP/1.0 OVER TCP OR A UNIX SOCKET (stdlib only)
+#   POST /verify/face   {"source": "clip.mp4" | "synthetic:90" | 0, "timeout": 10}
+#   POST /verify/voice  {"wav": "sample.wav", "phrase": "hello professor"}
+#   GET  /metrics, GET /metrics/prometheus (per-stage histograms), GET /health
+# --------------------------------------------------
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 503: "Service Unavailable"}
+
+def request_path(name, folder, field):
+    # A client-supplied name, resolved (symlinks, "..") inside `folder` only
+    root = os.path.realpath(folder)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root or not os.path.exists(path):
+        raise ValueError(f"{field} must be an existing entry in {folder}/")
+    return path
+
+def check_face_params(body, face_dir=FACE_DIR):
+    # The client may pick a recording from FACE_DIR or a synthetic clip, never
+    # an arbitrary file or camera, and a bounded timeout
+    if not isinstance(body, dict):
+        raise ValueError("expected a JSON object")
+
+    timeout = body.get("timeout", FACE_TIMEOUT)
+    if (isinstance(timeout, bool) or not isinstance(timeout, (int, float))
+            or not 0 < timeout <= MAX_FACE_TIMEOUT):
+        raise ValueError(f"timeout must be a number of seconds in (0, {MAX_FACE_TIMEOUT}]")
+
+    source = body.get("source")
+    if source is None:
+        source = FACE_CAMERA
+    elif not isinstance(source, str):
+        raise ValueError("source must be a synthetic:N spec or a name in face_requests/")
+    elif source.startswith("synthetic"):
+        _, _, frames = source.partition(":")
+        if frames and not (frames.isdigit() and int(frames) > 0):
+            raise ValueError("synthetic source must be synthetic or synthetic:N with N > 0")
+    else:
+        source = request_path(source, face_dir, "source")
+    return {"source": source, "timeout": timeout}
+
+def check_voice_params(body, wav_dir=WAV_DIR):
+    # The client names a recording and a challenge; neither may reach outside
+    # WAV_DIR or the configured phrase set
+    if not isinstance(body, dict):
+        raise ValueError("expected a JSON object")
+    params = {}
+    wav = body.get("wav")
+    if wav is not None:
+        if not isinstance(wav, str) or not wav.lower().endswith(".wav"):
+            raise ValueError("wav must be a .wav file name")
+        path = request_path(wav, wav_dir, "wav")
+        if not os.path.isfile(path):
+            raise ValueError(f"wav must be an existing file in {wav_dir}/")
+        params["wav"] = path
+
+    phrase = body.get("phrase")
+    if phrase is not None:
+        if not isinstance(phrase, str) or phrase not in phrase_set:
+            raise ValueError("phrase must be one of the configured challenge phrases")
+        params["phrase"] = phrase
+    return params
+
+async def read_request(reader):
+    method, path, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0))
+    body = json.loads(await reader.readexactly(length)) if length else {}
+    return method, path, body
+
+def make_handler(service):
+
+    async def dispatch(method, path, body):
+        if method == "GET" and path == "/health":
+            return 200, {"ok": True}
+        if method == "GET" and path == "/metrics":
+            return 200, service.metrics()
+        if method == "GET" and path == "/metrics/prometheus":
+            return 200, metrics.prometheus_text()
+        if method == "POST" and path == "/verify/face":
+            return await service.submit("face", check_face_params(body))
+        if method == "POST" and path == "/verify/voice":
+            return await service.submit("voice", check_voice_params(body))
+        return 404, {"error": f"no route for {method} {path}"}
+
+    async def handle(reader, writer):
+        try:
+            method, path, body = await read_request(reader)
+            status, payload = await dispatch(method, path, body)
+        except (ValueError, json.JSONDecodeError, asyncio.IncompleteReadError) as e:
+            status, payload = 400, {"error": str(e)}
+
+        if isinstance(payload, str):
+            data, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        writer.write(
+            f"HTTP/1.0 {status} {REASONS[status]}\r\n"
+            f"Content-Type: {content_type}\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+            + data
+        )
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return handle
+
+async def serve(host=HOST, port=PORT, unix_path=None, **service_options):
+    service = VerificationService(**service_options)
+    await service.start()
+
+    handler = make_handler(service)
+    if unix_path:
+        server = await asyncio.start_unix_server(handler, path=unix_path)
+        print(f"🟢 Verification service listening on {unix_path}")
+    else:
+        server = await asyncio.start_server(handler, host, port)
+        print(f"🟢 Verification service listening on http://{host}:{port}")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the verification service")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--unix", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--face-workers", type=int, default=FACE_WORKERS)
+    parser.add_argument("--voice-workers", type=int, default=VOICE_WORKERS)
+    parser.add_argument("--queue-limit", type=int, default=QUEUE_LIMIT)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(
+            args.host, args.port, args.unix,
+            face_workers=args.face_workers,
+            voice_workers=args.voice_workers,
+            queue_limit=args.queue_limit
+        ))
+    except KeyboardInterrupt:
+        print("\nService stopped")
@@ -1,13 +1,16 @@
 import os
-import sounddevice as sd
 from scipy.io.wavfile import write
 import time
 
+from voice_embeddings import enroll_faculty
+
 SAMPLE_RATE = 16000  # Hz
 DURATION = 3         # seconds per sample (adjustable)
 SAMPLES_PER_USER = 5
 
 def capture(faculty_id):
+    import sounddevice as sd
+
     save_dir = f"voices/{faculty_id}"
     os.makedirs(save_dir, exist_ok=True)
 
@@ -25,6 +28,9 @@ def capture(faculty_id):
         write(filename, SAMPLE_RATE, recording)  # writes int16 WAV
         print(f"Saved: {filename}")
 
+    print("\nComputing voice embeddings...")
+    enroll_faculty(faculty_id, save_dir)
+
     print("\nVoice capture complete!")
 
 if __name__ == "__main__":
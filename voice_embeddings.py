@@ -0,0 +1,209 @@
+import os
+import hashlib
+import threading
+import numpy as np
+
+from model_registry import get_speaker_model
+from atomic_file import atomic_write
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+VOICE_DIR = "voices"
+EMBEDDINGS_FILE = "voice_embeddings.npz"
+SAMPLE_RATE = 16000
+
+_store_cache = {"stat": None, "store": None, "version": 0}
+_store_lock = threading.Lock()   # stage threads and service workers reload at once
+
+# --------------------------------------------------
+# SPEAKER MODEL
+# --------------------------------------------------
+def get_verifier():
+    return get_speaker_model()
+
+# --------------------------------------------------
+# AUDIO UTILITIES (WINDOWS SAFE)
+# --------------------------------------------------
+def load_wav_tensor(path):
+    import torchaudio
+
+    signal, sr = torchaudio.load(path)
+    if sr != SAMPLE_RATE:
+        signal = torchaudio.functional.resample(signal, sr, SAMPLE_RATE)
+    return signal
+
+def signal_from_samples(samples):
+    # (1 x T) tensor sharing memory with the float32 numpy samples
+    import torch
+
+    return torch.from_numpy(samples).unsqueeze(0)
+
+def embed_signal(signal):
+    emb = get_verifier().encode_batch(signal)
+    return emb.squeeze().detach().cpu().numpy().astype(np.float32)
+
+def embed_file(path):
+    return embed_signal(load_wav_tensor(path))
+
+# --------------------------------------------------
+# EMBEDDING STORE
+# store = {faculty_id: {sample_name: {"mtime", "sha1", "embedding"}}}
+# --------------------------------------------------
+def file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def sample_files(voice_dir):
+    if not os.path.isdir(voice_dir):
+        return []
+    return sorted(f for f in os.listdir(voice_dir) if f.endswith(".wav"))
+
+def _file_stat(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+def store_version():
+    return _store_cache["version"]
+
+def load_store():
+    if not os.path.exists(EMBEDDINGS_FILE):
+        return {}
+
+    with _store_lock:
+        # Reuse the in-memory copy until the file changes on disk
+        stat = _file_stat(EMBEDDINGS_FILE)
+        if _store_cache["stat"] == stat:
+            return _store_cache["store"]
+
+        store = {}
+        with np.load(EMBEDDINGS_FILE) as data:
+            rows = zip(data["ids"], data["samples"], data["mtimes"],
+                       data["hashes"], data["embeddings"])
+            for faculty_id, sample, mtime, sha1, emb in rows:
+                store.setdefault(str(faculty_id), {})[str(sample)] = {
+                    "mtime": float(mtime),
+                    "sha1": str(sha1),
+                    "embedding": emb
+                }
+
+        _store_cache.update(stat=stat, store=store, version=_store_cache["version"] + 1)
+        return store
+
+def save_store(store):
+    ids, samples, mtimes, hashes, embeddings = [], [], [], [], []
+    for faculty_id, entries in store.items():
+        for sample, entry in entries.items():
+            ids.append(faculty_id)
+            samples.append(sample)
+            mtimes.append(entry["mtime"])
+            hashes.append(entry["sha1"])
+            embeddings.append(entry["embedding"])
+
+    with atomic_write(EMBEDDINGS_FILE, "wb") as f:
+        np.savez(
+            f,
+            ids=np.array(ids, dtype=str),
+            samples=np.array(samples, dtype=str),
+            mtimes=np.array(mtimes, dtype=np.float64),
+            hashes=np.array(hashes, dtype=str),
+            embeddings=np.array(embeddings, dtype=np.float32).reshape(len(ids), -1)
+        )
+
+    with _store_lock:
+        _store_cache.update(
+            stat=_file_stat(EMBEDDINGS_FILE),
+            store=store,
+            version=_store_cache["version"] + 1
+        )
+
+def refresh_faculty(store, faculty_id, voice_dir, force=False):
+    # Re-embed only samples whose mtime AND content hash changed
+    entries = store.get(faculty_id, {})
+    fresh = {}
+    changed = False
+
+    for fname in sample_files(voice_dir):
+        path = os.path.join(voice_dir, fname)
+        mtime = os.path.getmtime(path)
+        entry = entries.get(fname)
+
+        if not force and entry is not None and entry["mtime"] == mtime:
+            fresh[fname] = entry
+            continue
+
+        sha1 = file_sha1(path)
+        if not force and entry is not None and entry["sha1"] == sha1:
+            fresh[fname] = dict(entry, mtime=mtime)
+        else:
+            try:
+                fresh[fname] = {
+                    "mtime": mtime,
+                    "sha1": sha1,
+                    "embedding": embed_file(path)
+                }
+            except Exception as e:
+                print(f"⚠️ Skipped {path}: {e}")
+                continue
+        changed = True
+
+    if set(fresh) != set(entries):
+        changed = True
+
+    if fresh:
+        store[faculty_id] = fresh
+    else:
+        store.pop(faculty_id, None)
+
+    return changed
+
+# --------------------------------------------------
+# ENROLLMENT / VERIFICATION HOOKS
+# --------------------------------------------------
+def enroll_faculty(faculty_id, voice_dir=None):
+    faculty_id = str(faculty_id)
+    voice_dir = voice_dir or f"{VOICE_DIR}/{faculty_id}"
+
+    store = load_store()
+    if refresh_faculty(store, faculty_id, voice_dir):
+        save_store(store)
+    return store
+
+def remove_faculty(faculty_id):
+    store = load_store()
+    if store.pop(str(faculty_id), None) is not None:
+        save_store(store)
+    return store
+
+def sync_store(db, force=False):
+    store = load_store()
+    changed = False
+
+    for faculty_id, info in db.items():
+        voice_dir = info.get("voice_path", f"{VOICE_DIR}/{faculty_id}")
+        if refresh_faculty(store, faculty_id, voice_dir, force=force):
+            changed = True
+
+    for faculty_id in list(store):
+        if faculty_id not in db:
+            del store[faculty_id]
+            changed = True
+
+    if changed:
+        save_store(store)
+    return store
+
+if __name__ == "__main__":
+    import sys
+
+    import faculty_db
+
+    if not faculty_db.exists():
+        print(f"❌ No {faculty_db.describe()} found.")
+    else:
+        store = sync_store(faculty_db.get_db(), force="--rebuild" in sys.argv)
+        total = sum(len(entries) for entries in store.values())
+        print(f"✅ Voice embeddings ready: {total} samples, {len(store)} faculty")
@@ -0,0 +1,285 @@
+import os
+import threading
+import numpy as np
+
+from voice_embeddings import store_version
+from atomic_file import atomic_write
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+TOP_K = 3
+AGGREGATION = "max"   # "max" or "mean" over a faculty's samples
+
+INDEX_FILE = "voice_index.npz"
+ANN_MIN_IDENTITIES = 2000   # below this, exact matrix scoring is fast enough
+N_PROBE = 8                 # coarse cells visited per query
+SHORTLIST = 32              # identities reranked exactly per query
+KMEANS_ITERATIONS = 10
+
+_matrix = None
+_matrix_version = None
+_index = None
+_index_version = None
+# Concurrent verifications (stage pool, service workers) share these: a stale
+# version is rebuilt / synced by one thread, and the index is never searched
+# while another thread syncs it
+_matrix_lock = threading.Lock()
+_index_lock = threading.RLock()
+
+# --------------------------------------------------
+# IN-MEMORY EMBEDDING MATRIX
+# --------------------------------------------------
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-6)
+
+def aggregate(scores, aggregation=AGGREGATION):
+    return float(scores.mean() if aggregation == "mean" else scores.max())
+
+class VoiceMatrix:
+    # (N x D) matrix of unit-norm sample embeddings, rows grouped per faculty
+
+    def __init__(self, store):
+        self.faculty_ids = []
+        offsets = []
+        rows = []
+
+        for faculty_id, entries in store.items():
+            if not entries:
+                continue
+            self.faculty_ids.append(faculty_id)
+            offsets.append(len(rows))
+            rows.extend(entry["embedding"] for entry in entries.values())
+
+        self.offsets = np.array(offsets, dtype=np.intp)
+        self.counts = np.diff(np.append(self.offsets, len(rows)))
+        self.matrix = normalize(rows) if rows else np.zeros((0, 0), np.float32)
+
+    def __len__(self):
+        return len(self.faculty_ids)
+
+    def faculty_scores(self, probe, aggregation=AGGREGATION):
+        # One matrix-vector product scores the probe against every sample
+        scores = self.matrix @ normalize(probe)
+
+        if aggregation == "mean":
+            return np.add.reduceat(scores, self.offsets) / self.counts
+        return np.maximum.reduceat(scores, self.offsets)
+
+    def top_k(self, probe, k=TOP_K, aggregation=AGGREGATION):
+        if not self.faculty_ids:
+            return []
+
+        per_faculty = self.faculty_scores(probe, aggregation)
+        k = min(k, len(per_faculty))
+        best = np.argpartition(-per_faculty, k - 1)[:k]
+        best = best[np.argsort(-per_faculty[best])]
+
+        return [(self.faculty_ids[i], float(per_faculty[i])) for i in best]
+
+def get_matrix(store):
+    # Rebuild only when the embedding store has been reloaded or saved
+    global _matrix, _matrix_version
+
+    with _matrix_lock:
+        version = store_version()
+        if _matrix is None or _matrix_version != version:
+            _matrix = VoiceMatrix(store)
+            _matrix_version = version
+        return _matrix
+
+# --------------------------------------------------
+# APPROXIMATE INDEX (IVF OVER IDENTITY CENTROIDS)
+# --------------------------------------------------
+def spherical_kmeans(points, n_clusters, iterations=KMEANS_ITERATIONS, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = points[rng.choice(len(points), n_clusters, replace=False)]
+
+    for _ in range(iterations):
+        assign = np.argmax(points @ centers.T, axis=1)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, assign, points)
+        empty = ~sums.any(axis=1)
+        sums[empty] = centers[empty]
+        centers = normalize(sums)
+
+    return centers
+
+class IVFIndex:
+    # Each identity is represented by the unit-norm mean of its samples.
+    # Centroids are bucketed into coarse k-means cells; a query visits the
+    # n_probe closest cells, keeps the best `shortlist` identities by centroid
+    # score and reranks those exactly against their individual samples.
+
+    def __init__(self, coarse=None, n_probe=N_PROBE, shortlist=SHORTLIST):
+        self.coarse = coarse
+        self.n_probe = n_probe
+        self.shortlist = shortlist
+        self.trained_size = 0 if coarse is None else len(coarse) ** 2
+
+        self.samples = {}       # faculty_id -> (n x D) unit-norm samples
+        self.signatures = {}    # faculty_id -> sample hashes, to spot re-enrollment
+        self.slots = {}         # faculty_id -> row in self.centroids
+        self.ids = []           # row -> faculty_id (None once deleted)
+        self.free = []
+        self.centroids = None
+        self.cells = np.zeros(0, np.intp)
+        self.lists = [] if coarse is None else [set() for _ in coarse]
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _allocate(self, dim):
+        if self.free:
+            return self.free.pop()
+
+        row = len(self.ids)
+        if self.centroids is None:
+            self.centroids = np.zeros((64, dim), np.float32)
+            self.cells = np.zeros(64, np.intp)
+        elif row >= len(self.centroids):
+            capacity = 2 * len(self.centroids)
+            grown = np.zeros((capacity, dim), np.float32)
+            grown[:row] = self.centroids[:row]
+            self.centroids = grown
+            self.cells = np.resize(self.cells, capacity)
+        self.ids.append(None)
+        return row
+
+    def insert(self, faculty_id, embeddings, signature=None):
+        if faculty_id in self.slots:
+            self.delete(faculty_id)
+
+        samples = normalize(embeddings).reshape(-1, np.shape(embeddings)[-1])
+        row = self._allocate(samples.shape[1])
+
+        self.samples[faculty_id] = samples
+        self.signatures[faculty_id] = signature
+        self.slots[faculty_id] = row
+        self.ids[row] = faculty_id
+        self.centroids[row] = normalize(samples.mean(axis=0))
+
+        if self.coarse is not None:
+            cell = int(np.argmax(self.coarse @ self.centroids[row]))
+            self.cells[row] = cell
+            self.lists[cell].add(row)
+
+        # Re-cluster once the roster has doubled since the last training
+        if len(self) >= ANN_MIN_IDENTITIES and len(self) >= 2 * self.trained_size:
+            self.train()
+
+    def delete(self, faculty_id):
+        row = self.slots.pop(faculty_id, None)
+        if row is None:
+            return False
+
+        if self.coarse is not None:
+            self.lists[self.cells[row]].discard(row)
+        del self.samples[faculty_id]
+        del self.signatures[faculty_id]
+        self.ids[row] = None
+        self.free.append(row)
+        return True
+
+    def train(self, seed=0):
+        rows = np.array(sorted(self.slots.values()), dtype=np.intp)
+        n_lists = max(1, int(np.sqrt(len(rows))))
+
+        self.coarse = spherical_kmeans(self.centroids[rows], n_lists, seed=seed)
+        self.trained_size = len(rows)
+        self.lists = [set() for _ in range(n_lists)]
+
+        cells = np.argmax(self.centroids[rows] @ self.coarse.T, axis=1)
+        self.cells[rows] = cells
+        for row, cell in zip(rows, cells):
+            self.lists[cell].add(int(row))
+
+    def _rerank(self, rows, probe, k, aggregation):
+        ranked = []
+        for row in rows:
+            faculty_id = self.ids[row]
+            ranked.append((faculty_id, aggregate(self.samples[faculty_id] @ probe, aggregation)))
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked[:k]
+
+    def search(self, probe, k=TOP_K, aggregation=AGGREGATION):
+        if not self.slots:
+            return []
+
+        probe = normalize(probe)
+
+        if self.coarse is None:
+            candidates = np.array(sorted(self.slots.values()), dtype=np.intp)
+        else:
+            n_probe = min(self.n_probe, len(self.coarse))
+            cells = np.argpartition(-(self.coarse @ probe), n_probe - 1)[:n_probe]
+            candidates = np.fromiter(
+                (row for cell in cells for row in self.lists[cell]), dtype=np.intp
+            )
+            if len(candidates) == 0:
+                return []
+
+        shortlist = min(max(self.shortlist, k), len(candidates))
+        centroid_scores = self.centroids[candidates] @ probe
+        best = np.argpartition(-centroid_scores, shortlist - 1)[:shortlist]
+
+        return self._rerank(candidates[best], probe, k, aggregation)
+
+    def sync(self, store):
+        # Bring the index in line with the embedding store incrementally
+        for faculty_id in list(self.slots):
+            if faculty_id not in store or not store[faculty_id]:
+                self.delete(faculty_id)
+
+        for faculty_id, entries in store.items():
+            if not entries:
+                continue
+            signature = tuple(entry["sha1"] for entry in entries.values())
+            if self.signatures.get(faculty_id) != signature:
+                embeddings = [entry["embedding"] for entry in entries.values()]
+                self.insert(faculty_id, embeddings, signature)
+
+        if self.coarse is None and len(self) >= ANN_MIN_IDENTITIES:
+            self.train()
+
+# --------------------------------------------------
+# PERSISTENCE (coarse cells only; samples live in the embedding store)
+# --------------------------------------------------
+def load_index():
+    if not os.path.exists(INDEX_FILE):
+        return IVFIndex()
+    with np.load(INDEX_FILE) as data:
+        return IVFIndex(coarse=data["coarse"])
+
+def save_index(index):
+    if index.coarse is None:
+        return
+    with atomic_write(INDEX_FILE, "wb") as f:
+        np.savez(f, coarse=index.coarse)
+
+def get_index(store):
+    global _index, _index_version
+
+    with _index_lock:
+        if _index is None:
+            _index = load_index()
+
+        version = store_version()
+        if _index_version != version:
+            trained_size = _index.trained_size
+            _index.sync(store)
+            _index_version = version
+            if _index.trained_size != trained_size:
+                save_index(_index)
+        return _index
+
+# --------------------------------------------------
+# IDENTIFICATION
+# --------------------------------------------------
+def identify(store, probe, k=TOP_K, aggregation=AGGREGATION):
+    if len(store) < ANN_MIN_IDENTITIES:
+        return get_matrix(store).top_k(probe, k, aggregation)
+    with _index_lock:
+        return get_index(store).search(probe, k, aggregation)
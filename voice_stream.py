@@ -0,0 +1,126 @@
+import json
+import time
+import queue
+import numpy as np
+
+from audio_clip import AudioClip, load_audio, SAMPLE_RATE
+from phrase_recognizer import strip_unk
+
+# --------------------------------------------------
+# CONFIG
+# --------------------------------------------------
+BLOCK_FRAMES = 4000        # 0.25s per block at 16 kHz
+MAX_DURATION = 3           # seconds; the old fixed recording window
+MIN_DURATION = 1.0         # keep at least this much audio for the speaker model
+
+# --------------------------------------------------
+# AUDIO STREAMS (yield int16 blocks until exhausted or closed)
+# --------------------------------------------------
+class MicrophoneStream:
+
+    def __init__(self, sample_rate=SAMPLE_RATE, blocksize=BLOCK_FRAMES):
+        import sounddevice as sd
+
+        self.sample_rate = sample_rate
+        self.blocks = queue.Queue()
+        self.stream = sd.InputStream(
+            samplerate=sample_rate,
+            blocksize=blocksize,
+            channels=1,
+            dtype="int16",
+            callback=self._callback
+        )
+
+    def _callback(self, indata, frames, time_info, status):
+        # Runs on the PortAudio thread: copy out and hand off immediately
+        self.blocks.put(indata[:, 0].copy())
+
+    def __enter__(self):
+        self.stream.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stream.stop()
+        self.stream.close()
+
+    def read(self, timeout=1.0):
+        try:
+            return self.blocks.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class WavFileStream:
+    # Plays a WAV file block by block, optionally in real time, like a microphone
+
+    def __init__(self, path, blocksize=BLOCK_FRAMES, realtime=False):
+        self.clip = load_audio(path)
+        self.sample_rate = self.clip.sample_rate
+        self.blocksize = blocksize
+        self.realtime = realtime
+        self.position = 0
+
+    def __enter__(self):
+        self.started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def read(self, timeout=1.0):
+        if self.position >= len(self.clip):
+            return None
+
+        block = self.clip.pcm[self.position:self.position + self.blocksize]
+        self.position += len(block)
+
+        if self.realtime:
+            due = self.started_at + self.position / self.sample_rate
+            time.sleep(max(0.0, due - time.perf_counter()))
+        return block
+
+# --------------------------------------------------
+# STREAMING PHRASE RECOGNITION
+# --------------------------------------------------
+def stream_phrase(recognizer, stream, expected_phrase, similarity, threshold,
+                  max_duration=MAX_DURATION):
+    # Feed blocks to Vosk as they arrive and stop as soon as the running
+    # transcript (finals + current partial) matches the challenge phrase.
+    blocks = []
+    finals = []
+    text = ""
+    matched = False
+    stopped_early = False
+    max_frames = int(max_duration * stream.sample_rate)
+    min_frames = int(MIN_DURATION * stream.sample_rate)
+    received = 0
+
+    with stream:
+        while received < max_frames:
+            block = stream.read()
+            if block is None:
+                break
+
+            blocks.append(block)
+            received += len(block)
+
+            if recognizer.AcceptWaveform(block.tobytes()):
+                finals.append(json.loads(recognizer.Result()).get("text", ""))
+                partial = ""
+            else:
+                partial = json.loads(recognizer.PartialResult()).get("partial", "")
+
+            text = strip_unk(" ".join(t for t in finals + [partial] if t).lower()).strip()
+            if text and similarity(text, expected_phrase) >= threshold:
+                matched = True
+                if received >= min_frames:
+                    stopped_early = True
+                    break
+
+    # Unless we stopped on a match, flush the decoder: the last partial may
+    # be stale (e.g. matched before MIN_DURATION, then hit max_frames)
+    if not stopped_early:
+        finals.append(json.loads(recognizer.FinalResult()).get("text", ""))
+        text = strip_unk(" ".join(t for t in finals if t).lower()).strip()
+
+    pcm = np.concatenate(blocks) if blocks else np.zeros(0, np.int16)
+    return text, AudioClip(pcm, stream.sample_rate), matched
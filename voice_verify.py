@@ -1,81 +1,52 @@
-import os
 import json
 import time
 import random
-import sounddevice as sd
-from scipy.io.wavfile import write
 import numpy as np
-import librosa
-import wave
 import difflib
-import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import torch
-import torchaudio
-
-from speechbrain.pretrained import SpeakerRecognition
-from vosk import Model, KaldiRecognizer
+from audio_clip import AudioClip
+from voice_stream import MicrophoneStream, WavFileStream, stream_phrase
+import phrase_recognizer
+from phrase_recognizer import detect_language, strip_unk
+from voice_embeddings import signal_from_samples, embed_signal, load_store
+from voice_index import identify
+import faculty_db
+import metrics
 
 # --------------------------------------------------
 # CONFIG
 # --------------------------------------------------
-DB_FILE = "database.json"
 SAMPLE_RATE = 16000
 DURATION = 3
-TEMP_FILE = "temp_verify.wav"
 SCORE_THRESHOLD = 0.6
 PHRASE_SIMILARITY_THRESHOLD = 0.7
+STREAMING = True   # decode while recording and stop once the phrase is heard
+STAGE_WORKERS = 3  # liveness, speech-to-text and speaker scoring run side by side
 
-VOSK_EN = "models/vosk-en"
-VOSK_PH = "models/vosk-ph"
-
-PHRASES = [
-    "magandang araw sayo kaibigan",
-    "may asong tumatawid ng kalsada",
-    "ang kulit mo",
-    "someone broke a glass bottle",
-    "the dog jumped over the fence",
-    "hello professor"
-]
-
-# --------------------------------------------------
-# LOAD MODELS (ONCE)
-# --------------------------------------------------
-print("Loading speaker verification model...")
-verifier = SpeakerRecognition.from_hparams(
-    source="speechbrain/spkrec-ecapa-voxceleb",
-    savedir="pretrained_models/spkrec-ecapa",
-    run_opts={"device": "cpu"}
-)
-
-print("Loading Vosk models...")
-vosk_models = {
-    "en": Model(VOSK_EN),
-    "ph": Model(VOSK_PH)
-}
+# Challenge phrases: phrase_recognizer.DEFAULT_PHRASES, or phrases.json
+# (python phrase_recognizer.py --add "..."). Vosk decodes against them as a grammar.
 
-# --------------------------------------------------
-# AUDIO UTILITIES (WINDOWS SAFE)
-# --------------------------------------------------
-def load_wav_tensor(path):
-    signal, sr = torchaudio.load(path)
-    if sr != SAMPLE_RATE:
-        signal = torchaudio.functional.resample(signal, sr, SAMPLE_RATE)
-    return signal
+# Models (ECAPA, Vosk) load on first use via model_registry; heavy
+# libraries are imported inside the functions that need them.
+_stage_pool = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="voice-stage")
 
 # --------------------------------------------------
 # BASIC AUDIO LIVENESS
 # --------------------------------------------------
-def compute_basic_audio_metrics(wav_path):
-    y, sr = librosa.load(wav_path, sr=SAMPLE_RATE)
-    rms = np.mean(librosa.feature.rms(y=y))
-    flatness = np.mean(librosa.feature.spectral_flatness(y=y))
-    centroid_var = np.var(librosa.feature.spectral_centroid(y=y, sr=sr))
+def compute_basic_audio_metrics(clip):
+    # All three come from the clip's single cached STFT (audio_features.py)
+    feats = clip.features()
+    rms = np.mean(feats.rms)
+    flatness = np.mean(feats.flatness)
+    centroid_var = np.var(feats.centroid)
     return rms, flatness, centroid_var
 
 
-def quick_liveness_check(wav_path):
-    rms, flatness, centroid_var = compute_basic_audio_metrics(wav_path)
+def quick_liveness_check(clip):
+    with metrics.span("voice.audio_metrics"):
+        rms, flatness, centroid_var = compute_basic_audio_metrics(clip)
 
     if rms < 1e-4:
         return False, "Silent or very low energy audio"
@@ -85,30 +56,19 @@ def quick_liveness_check(wav_path):
 
     return True, "Passed audio liveness checks"
 
-# --------------------------------------------------
-# LANGUAGE DETECTION
-# --------------------------------------------------
-def detect_language(text):
-    if re.search(r"[ñáéíóú]", text) or any(w in text for w in ["ang", "may", "sayo"]):
-        return "ph"
-    return "en"
-
 # --------------------------------------------------
 # SPEECH-TO-TEXT
 # --------------------------------------------------
-def recognize_speech(wav_path, lang):
-    wf = wave.open(wav_path, "rb")
-    rec = KaldiRecognizer(vosk_models[lang], wf.getframerate())
-    rec.SetWords(False)
+def recognize_speech(clip, lang, cancel=None, phrase=None):
+    # Pooled grammar recognizer: output is limited to the challenge phrases + [unk]
+    with phrase_recognizer.recognizer(lang, clip.sample_rate, phrase) as rec:
+        for data in clip.pcm_chunks(4000):
+            if cancel is not None and cancel.is_set():
+                return None
+            rec.AcceptWaveform(data)
 
-    while True:
-        data = wf.readframes(4000)
-        if len(data) == 0:
-            break
-        rec.AcceptWaveform(data)
-
-    result = json.loads(rec.FinalResult())
-    return result.get("text", "").lower().strip()
+        result = json.loads(rec.FinalResult())
+    return strip_unk(result.get("text", "").lower()).strip()
 
 
 def phrase_similarity(a, b):
@@ -117,13 +77,21 @@ def phrase_similarity(a, b):
 # --------------------------------------------------
 # RECORD VOICE WITH CHALLENGE
 # --------------------------------------------------
-def record_temp_sample():
-    phrase = random.choice(PHRASES)
+def prompt_phrase(phrase=None):
+    phrase = phrase or random.choice(phrase_recognizer.phrase_set.phrases())
 
     print("\n🔐 VOICE LIVENESS CHECK")
     print("Please clearly say the following phrase:")
     print(f'➡️  "{phrase}"')
 
+    return phrase.lower()
+
+def record_sample():
+    import sounddevice as sd
+
+    phrase = prompt_phrase()
+    warm = phrase_recognizer.prefetch(detect_language(phrase))
+
     time.sleep(2)
 
     print(f"\nRecording... (~{DURATION}s)")
@@ -134,31 +102,56 @@ def record_temp_sample():
         dtype="int16"
     )
     sd.wait()
-
-    write(TEMP_FILE, SAMPLE_RATE, recording)
-    print("Saved temporary verification audio.")
-
-    return phrase.lower()
-
-# --------------------------------------------------
-# VERIFY AGAINST DATABASE (FIXED)
-# --------------------------------------------------
-def verify_against_database(expected_phrase):
-    if not os.path.exists(DB_FILE):
-        print("❌ No database.json found.")
-        return None
-
-    ok, msg = quick_liveness_check(TEMP_FILE)
+    warm.join()   # decoding takes the prebuilt recognizer instead of building a second
+
+    # Kept in memory: no temp WAV to re-read or to clash with another session
+    return phrase.lower(), AudioClip(recording, SAMPLE_RATE)
+
+def record_sample_streaming(wav_path=None, phrase=None):
+    phrase = prompt_phrase(phrase)
+    lang = detect_language(phrase)
+
+    if wav_path:
+        # Decoding starts at once: nothing to overlap a prefetch with
+        stream = WavFileStream(wav_path)
+    else:
+        # Model + recognizer build overlap the 2 s lead-in, then are waited
+        # for, so the pool hands out the prebuilt recognizer
+        warm = phrase_recognizer.prefetch(lang)
+        stream = MicrophoneStream(SAMPLE_RATE)
+        time.sleep(2)
+        warm.join()
+
+    print(f"\nRecording... (up to {DURATION}s, stops once the phrase is heard)")
+    # Decoding runs as the audio arrives, so the span covers the recording too
+    with phrase_recognizer.recognizer(lang, SAMPLE_RATE, phrase) as rec, metrics.span("voice.vosk_decode", lang=lang):
+        recognized, clip, matched = stream_phrase(
+            rec, stream, phrase, phrase_similarity, PHRASE_SIMILARITY_THRESHOLD, DURATION
+        )
+    if matched:
+        print(f"⚡ Phrase heard after {clip.duration:.2f}s")
+
+    return phrase, clip, recognized
+
+# --------------------------------------------------
+# VERIFICATION STAGES
+# --------------------------------------------------
+def liveness_stage(clip):
+    ok, msg = quick_liveness_check(clip)
     print("Audio liveness:", msg)
-    if not ok:
-        return None
+    return ok
 
-    lang = detect_language(expected_phrase)
-    recognized = recognize_speech(TEMP_FILE, lang)
+def phrase_stage(clip, expected_phrase, recognized, cancel):
+    if recognized is None:
+        lang = detect_language(expected_phrase)
+        with metrics.span("voice.vosk_decode", lang=lang):
+            recognized = recognize_speech(clip, lang, cancel, expected_phrase)
+        if recognized is None:
+            return False   # cancelled by another gate
 
     if not recognized:
         print("❌ Speech not recognized")
-        return None
+        return False
 
     similarity = phrase_similarity(recognized, expected_phrase)
 
@@ -168,50 +161,95 @@ def verify_against_database(expected_phrase):
 
     if similarity < PHRASE_SIMILARITY_THRESHOLD:
         print("❌ Phrase mismatch — possible replay attack")
-        return None
+        return False
 
     print("✅ Phrase verified")
+    return True
+
+def speaker_stage(clip, db, cancel):
+    # Enrolled embeddings come from the on-disk store (kept current by the
+    # enrollment paths, reloaded only when the file changes); only the probe
+    # is embedded here
+    with metrics.span("voice.store_load"):
+        store = load_store()
+    if cancel.is_set():
+        return None
 
-    db = json.load(open(DB_FILE, "r"))
-    best_score = -1.0
-    best_id = None
-
-    test_sig = load_wav_tensor(TEMP_FILE)
-
-    for faculty_id, info in db.items():
-        voice_dir = info.get("voice_path", f"voices/{faculty_id}")
-        if not os.path.isdir(voice_dir):
-            continue
-
-        for fname in os.listdir(voice_dir):
-            if not fname.endswith(".wav"):
-                continue
-
-            enrolled = os.path.join(voice_dir, fname)
+    with metrics.span("voice.ecapa_embed"):
+        test_emb = embed_signal(signal_from_samples(clip.samples))
+    if cancel.is_set():
+        return None
 
-            try:
-                enrolled_sig = load_wav_tensor(enrolled)
+    with metrics.span("voice.identify"):
+        ranking = identify(store, test_emb)
+    # A store entry left behind by an out-of-band delete never grants access
+    return [(faculty_id, score) for faculty_id, score in ranking if faculty_id in db]
 
-                score, _ = verifier.verify_batch(
-                    enrolled_sig,
-                    test_sig
-                )
-                score = float(score)
+# --------------------------------------------------
+# VERIFY AGAINST DATABASE (FIXED)
+# --------------------------------------------------
+def verify_against_database(expected_phrase, clip, recognized=None):
+    if not faculty_db.exists():
+        print(f"❌ No {faculty_db.describe()} found.")
+        return None
 
-                if score > best_score:
-                    best_score = score
-                    best_id = faculty_id
+    with metrics.span("db.load"):
+        db = faculty_db.get_db()
+
+    # Liveness and phrase are gates; speaker scoring runs alongside them and
+    # everything still running is cancelled as soon as one gate fails
+    cancel = threading.Event()
+    start = time.perf_counter()
+    gates = [
+        _stage_pool.submit(liveness_stage, clip),
+        _stage_pool.submit(phrase_stage, clip, expected_phrase, recognized, cancel)
+    ]
+    speaker = _stage_pool.submit(speaker_stage, clip, db, cancel)
+
+    try:
+        for future in as_completed(gates):
+            if not future.result():
+                cancel.set()
+                for pending in gates + [speaker]:
+                    pending.cancel()
+                elapsed = time.perf_counter() - start
+                print(f"⏱️ Voice stages stopped after {elapsed:.2f}s")
+                reason = "liveness" if future is gates[0] else "phrase_mismatch"
+                metrics.record_outcome("voice", "denied", reason, elapsed)
+                return None
+        ranking = speaker.result()
+    except BaseException:
+        cancel.set()
+        raise
+
+    elapsed = time.perf_counter() - start
+    print(f"⏱️ Voice stages: {elapsed:.2f}s")
+
+    if not ranking:
+        print("❌ No enrolled voice samples found.")
+        metrics.record_outcome("voice", "denied", "no_samples", elapsed)
+        return None
 
-            except Exception as e:
-                print(f"⚠️ Skipped {enrolled}: {e}")
+    for rank, (faculty_id, score) in enumerate(ranking, 1):
+        print(f"  #{rank} Faculty ID {faculty_id}: {score:.4f}")
 
+    best_id, best_score = ranking[0]
     print(f"\nBest score: {best_score:.4f} (threshold {SCORE_THRESHOLD})")
 
-    return best_id if best_score >= SCORE_THRESHOLD else None
+    if best_score < SCORE_THRESHOLD:
+        metrics.record_outcome("voice", "denied", "below_threshold", elapsed)
+        return None
+    metrics.record_outcome("voice", "granted", seconds=elapsed)
+    return best_id
 
 # --------------------------------------------------
 # ENTRY POINT
 # --------------------------------------------------
-def verify_voice():
-    expected_phrase = record_temp_sample()
-    return verify_against_database(expected_phrase)
+def verify_voice(wav_path=None, phrase=None):
+    # wav_path replays a recording through the streaming path (no microphone)
+    if STREAMING or wav_path:
+        expected_phrase, clip, recognized = record_sample_streaming(wav_path, phrase)
+        return verify_against_database(expected_phrase, clip, recognized)
+
+    expected_phrase, clip = record_sample()
+    return verify_against_database(expected_phrase, clip)